@@ -12,6 +12,8 @@ Modules:
 
 - models.py: the data types (cards, decks, sets, rulings, enums).
 - collections.py: `CardDict`, the cards library, with its search index.
+- query.py: a boolean query language over the search index.
+- sqlite.py: export the cards library to a searchable SQLite file.
 - loader.py: load the cards library (`load` / `load_local` / `load_online`).
 - twda.py: the Tournament Winning Decks Archive.
 - vekn_csv.py: build cards from the packaged VEKN CSVs.
@@ -1,15 +1,123 @@
 """Collections of cards."""
 
-from collections.abc import Generator, Hashable
+from collections.abc import Collection, Hashable, Iterable, Iterator
+from typing import Any, NamedTuple
+import bisect
 import collections
+import datetime
+import itertools
 import msgspec
+import numpy
 import re
+import threading
 
 from . import models
 from . import utils
 
-#: a set-dimension index: value (or None) -> matching cards
-type SetIndex = collections.defaultdict[str | None, set[models.Card]]
+#: a set-dimension index: value (or None) -> ordinals of the matching cards
+type SetIndex = collections.defaultdict[str | None, set[int]]
+
+#: the values of a card in a dimension: per language for the text dimensions
+type DimensionValues = dict[models.Lang, list[str]] | list[str]
+
+#: a quoted phrase in a text search
+RE_PHRASE = re.compile(r'"([^"]*)"')
+
+#: the references, symbols and card markup of a ruling text
+RE_RULING_MARKUP = re.compile(r"\[[^\]]*\]|[{}]")
+
+
+class CardTable:
+    """The cards in a dense array, addressed by ordinal.
+
+    Each card id gets an ordinal, its slot in the array, until the next `sort`: a
+    removed card leaves an empty slot, which the same id takes back if re-added.
+    Indexes can then refer to cards by ordinal, a small int, and sets of ordinals
+    are cheaper than sets of cards.
+
+    The slots are in id order as long as the ids are added in order, or right after
+    `sort`; the iteration is in id order in any case.
+    """
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self.slots: list[models.Card | None] = []
+        #: card id -> ordinal, kept when the card is removed
+        self.ordinals: dict[int, int] = {}
+        self._count = 0
+        # the slots are in id order as long as the ids are added in order
+        self._ordered = True
+        self._last_id = 0
+
+    def add(self, card: models.Card) -> int:
+        """Add a card, replacing the card of same id if any.
+
+        Returns:
+            The card ordinal.
+        """
+        ordinal = self.ordinals.get(card.id)
+        if ordinal is None:
+            if card.id < self._last_id:
+                self._ordered = False
+            self._last_id = max(self._last_id, card.id)
+            ordinal = self.ordinals[card.id] = len(self.slots)
+            self.slots.append(None)
+        if self.slots[ordinal] is None:
+            self._count += 1
+        self.slots[ordinal] = card
+        return ordinal
+
+    def sort(self) -> None:
+        """Put the slots in id order, drop the empty ones and renumber the cards.
+
+        This invalidates the ordinals: only call it before reindexing the cards.
+        A table already in id order is left as is.
+        """
+        if self._ordered:
+            return
+        cards = list(self)
+        self.slots = list(cards)
+        self.ordinals = {card.id: ordinal for ordinal, card in enumerate(cards)}
+        self._ordered = True
+        self._last_id = cards[-1].id if cards else 0
+
+    def remove(self, card_id: int) -> models.Card:
+        """Remove a card by id.
+
+        Raises:
+            KeyError: If the card is not in the table.
+
+        Returns:
+            The card removed.
+        """
+        ordinal = self.ordinals[card_id]
+        card = self.slots[ordinal]
+        if card is None:
+            raise KeyError(card_id)
+        self.slots[ordinal] = None
+        self._count -= 1
+        return card
+
+    def __getitem__(self, ordinal: int) -> models.Card:
+        """Get a card by ordinal."""
+        card = self.slots[ordinal]
+        if card is None:
+            raise KeyError(ordinal)
+        return card
+
+    def __len__(self) -> int:
+        """Return the number of cards."""
+        return self._count
+
+    def __iter__(self) -> Iterator[models.Card]:
+        """Iterate over the cards, in id order."""
+        if self._ordered:
+            return (card for card in self.slots if card is not None)
+        return (
+            card
+            for card in (self.slots[self.ordinals[i]] for i in sorted(self.ordinals))
+            if card is not None
+        )
 
 
 class CardDict(utils.FuzzyDict[int | str, models.Card]):
@@ -17,8 +125,12 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
 
     int keys are card IDs
     str keys are card names and variants (old name, translation, nickname)
+
+    The cards themselves are kept in a `CardTable`, in id order once indexed.
     """
 
+    _LOCKS = ("_lock", "_names_lock")
+
     def __init__(self, cards: dict[int, models.Card] | None = None) -> None:
         """Index the given cards by id and by every name variant.
 
@@ -27,22 +139,42 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
         """
         super().__init__()
         self.sets: dict[int | str, models.Set] = {}
-        self.search_index = CardSearch()
+        #: the rulings, each stored once, filled by the rulings loader
+        self.rulings = RulingIndex()
+        self.table = CardTable()
+        self.search_index = CardSearch(self.table)
+        #: automaton of the names and aliases, rebuilt on demand when cards change
+        self.names: utils.AhoCorasick[int] | None = None
+        # guards the rebuild of the names automaton
+        self._names_lock = threading.Lock()
+        # once indexed, add/remove/update keep the search index in sync
+        self.indexed = False
         for card in (cards or {}).values():
             self.add(card)
 
-    def cards(self) -> Generator[models.Card]:
-        """Iterate over cards (values) once each (int keys are the card ids)."""
-        for key, card in self.items():
-            if isinstance(key, int):
-                yield card
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled, the automaton is rebuilt."""
+        state = super().__getstate__()
+        state["names"] = None
+        return state
+
+    def cards(self) -> Iterator[models.Card]:
+        """Iterate over cards (values) once each, in id order."""
+        return iter(self.table)
 
     def __len__(self) -> int:
         """Return the number of distinct cards in the map."""
-        return sum(1 for _ in self.cards())
+        return len(self.table)
 
     def add(self, card: models.Card) -> None:
-        """Add a card."""
+        """Add a card, replacing the card of same id if any.
+
+        Once `index()` has run, the card and its rulings are also added to the
+        search index and the rulings index.
+        """
+        if card.id in self._dict:
+            self.remove(card.id)
+        self.table.add(card)
         self[card.id] = card
         # always unique: for vampires, includes group and advanced suffix
         self[card.full_name] = card
@@ -54,6 +186,52 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
                 self[variant.name] = card
             else:
                 self.add_alias(variant.name, card.id)
+        self.names = None
+        if self.indexed:
+            self.search_index.add(card)
+            self.rulings.add_cards([card])
+
+    def remove(self, card: models.Card | int) -> models.Card:
+        """Remove a card (or card id): its names, aliases, search and rulings entries.
+
+        Raises:
+            KeyError: If the card is not in the dict (only ids match, no fuzzy match).
+
+        Returns:
+            The card removed.
+        """
+        removed = self._dict.pop(card if isinstance(card, int) else card.id)
+        self.search_index.remove(removed)
+        self.rulings.remove(removed.id)
+        self.table.remove(removed.id)
+        names = [removed.full_name, removed.unique_name]
+        for variant in removed.name_variants:
+            if variant.type == models.NameVariant.Type.LEXICOGRAPHICAL:
+                names.append(variant.name)
+            elif self._aliases.get(utils.normalize(variant.name)) == removed.id:
+                del self._aliases[utils.normalize(variant.name)]
+        for name in dict.fromkeys(utils.normalize(name) for name in names):
+            if self._dict.get(name) is removed:
+                del self[name]
+        self.names = None
+        return removed
+
+    def update(self, card: models.Card) -> None:  # type: ignore
+        """Replace the card of same id, typically after changing it.
+
+        Raises:
+            KeyError: If there is no card with this id.
+        """
+        self.remove(card.id)
+        self.add(card)
+
+    def features(self, card: models.Card) -> models.CardFeatures:
+        """The sects, bonuses, titles, city and traits derived from a card text.
+
+        They are computed once per card by `index()`, on the fly before that.
+        """
+        features = self.search_index.features.get(card.id)
+        return features if features is not None else card_features(card)
 
     def pack(self) -> dict[str, models.Card]:
         """Cards keyed by their string id, for JSON export."""
@@ -69,12 +247,31 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
     def index(self) -> None:
         """Build the search index over the current cards.
 
-        Call this after loading (or mutating) the cards; the loaders do it for
-        you. `complete` and `search` return nothing until it has run.
+        Call this after loading the cards; the loaders do it for you. `complete`
+        and `search` return nothing until it has run. From then on, `add`,
+        `remove` and `update` keep it in sync, no need to call it again.
         """
-        self.search_index = CardSearch()
+        self.table.sort()
+        self.search_index = CardSearch(self.table)
         for card in self.cards():
             self.search_index.add(card)
+        self.search_index.index_playability()
+        self.search_index.index_catalogue()
+        self.rulings = RulingIndex(self.cards())
+        self.names = None
+        self.indexed = True
+
+    def index_rulings(self) -> None:
+        """Index the rulings again, after the rulings of the cards changed.
+
+        Only the rulings index and the cards named in rulings are rebuilt, not the
+        whole search index. Nothing to do if `index()` has not run yet.
+        """
+        if not self.indexed:
+            return
+        self.rulings = RulingIndex(self.cards())
+        for card in self.cards():
+            self.search_index.index_rulings(card)
 
     def complete(self, text: str, lang: str = models.Lang.EN) -> list[models.Card]:
         """Complete a card name.
@@ -88,7 +285,10 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
         Returns:
             Matching cards, most likely first.
         """
-        return self.search_index.name.search_flat(text, 10, lang)
+        return [
+            self.table[ordinal]
+            for ordinal in self.search_index.name.complete(text, 10, lang)
+        ]
 
     def search(
         self,
@@ -97,7 +297,7 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
         lang: models.Lang = models.Lang.EN,
         **criteria: list[str],
     ) -> list[models.Card]:
-        """Search cards across the available dimensions.
+        """Search cards across the available dimensions, all cards without criteria.
 
         Args:
             n: Maximum number of cards to return (defaults to 100).
@@ -112,24 +312,298 @@ class CardDict(utils.FuzzyDict[int | str, models.Card]):
             {models.SearchDimension(k): v for k, v in criteria.items()}, n, lang
         )
 
+    def find_mentions(self, text: str) -> list[utils.Mention[models.Card]]:
+        """Find the cards named in a free text, in a single pass over it.
+
+        Names are matched as the dict keys are: normalized (unidecode, lowercase),
+        with their variants and aliases, whole words only. No fuzzy match: a
+        misspelled name is not found. Overlapping names resolve to the leftmost,
+        then the longest (a card named like a common word is found too):
+
+        >>> cards.find_mentions("Carrion Crows, then Govern the Unaligned")
+        [Mention(start=0, end=13, reference=100301|Carrion Crows), ...]
+
+        The automaton is built on the first call, rebuilt on demand after `add`,
+        `remove` or `update`.
+
+        Args:
+            text: Any text.
+
+        Returns:
+            The cards named, with the span of their name in the text, in order.
+        """
+        names = self.names
+        if names is None:
+            with self._names_lock:
+                if self.names is None:
+                    self.names = self._names()
+                names = self.names
+        return [
+            utils.Mention(start, end, self._dict[card_id])
+            for start, end, card_id in names.find(text)
+        ]
+
+    def _names(self) -> utils.AhoCorasick[int]:
+        """Build the automaton of the card names and aliases, to card ids."""
+        patterns = []
+        for alias, target in self._aliases.items():
+            card = self._dict.get(utils.normalize(target))
+            if isinstance(alias, str) and card is not None:
+                patterns.append((alias, card.id))
+        # a name is matched before an alias of the same text
+        patterns.extend(
+            (name, card.id)
+            for name, card in self._dict.items()
+            if isinstance(name, str)
+        )
+        return utils.AhoCorasick(patterns)
+
+    def similar(
+        self, card: models.Card, n: int = 10, lang: models.Lang = models.Lang.EN
+    ) -> list[models.Card]:
+        """Find the cards most like a card, by their text.
+
+        Texts are compared as TF-IDF vectors (cosine similarity), built on the first
+        call and rebuilt on demand after `add`, `remove` or `update`.
+
+        Args:
+            card: The card to compare to (excluded from the result).
+            n: Maximum number of cards to return (defaults to 10).
+            lang: Language of the texts to compare (English if not translated).
+
+        Returns:
+            The most similar cards, most similar first. Empty if the cards are not
+            indexed, or the card is not one of them.
+        """
+        return self.search_index.similar(card, n, lang)
+
+    def feature_matrix(self) -> "FeatureMatrix":
+        """The cards x features matrix: disciplines, clans, sects, types, costs...
+
+        Built on first call and cached, rebuilt after `add`, `remove` or `update`.
+        Rows are in card id order, see `FeatureMatrix` for the columns:
+
+        >>> matrix = cards.feature_matrix()
+        >>> matrix.ids[matrix.column("discipline:pot") == 2]  # superior Potence
+
+        Returns:
+            The matrix, shared: copy it before modifying it.
+        """
+        return self.search_index.feature_matrix()
+
+    def referenced_by(
+        self, card: models.Card, lang: models.Lang = models.Lang.EN
+    ) -> "References":
+        """The cards and rulings naming a card, from the index (no scan).
+
+        Args:
+            card: The card named.
+            lang: The language of the card texts naming it (defaults to English).
+                Rulings are in English.
+
+        Returns:
+            The cards naming it in their text, by name, and the rulings naming
+            it, with the card each one rules on.
+        """
+        index = self.search_index
+        return References(
+            cards=sorted(
+                (
+                    self.table[self.table.ordinals[card_id]]
+                    for card_id in index.mentioned_in.get(card.id, {}).get(lang, ())
+                ),
+                key=lambda c: (c.printed_name, c.id),
+            ),
+            rulings=[
+                (ruled, ruled.rulings[i])
+                for ruled, i in sorted(
+                    (
+                        (self.table[self.table.ordinals[card_id]], i)
+                        for card_id, i in index.ruled_in.get(card.id, ())
+                    ),
+                    key=lambda item: (item[0].printed_name, item[0].id, item[1]),
+                )
+            ],
+        )
+
+    def playable(self, crypt: models.Card | Iterable[models.Card]) -> "SearchResult":
+        """The library cards a crypt card, or any card of a crypt, can play.
+
+        A library card is playable if the crypt card meets its clan, path,
+        discipline and title requirements: cards with none are always playable.
+
+        Args:
+            crypt: A crypt card, or the cards of a crypt.
+
+        Returns:
+            The playable library cards, sorted by name.
+        """
+        if isinstance(crypt, models.Card):
+            crypt = [crypt]
+        return SearchResult(
+            self.table,
+            self.search_index.playable(self.table.ordinals[c.id] for c in crypt),
+        )
+
+    def players(self, library: models.Card | Iterable[models.Card]) -> "SearchResult":
+        """The crypt cards able to play a library card, or any of several.
+
+        Args:
+            library: A library card, or several.
+
+        Returns:
+            The crypt cards meeting the requirements, sorted by name.
+        """
+        if isinstance(library, models.Card):
+            library = [library]
+        return SearchResult(
+            self.table,
+            self.search_index.players_of(self.table.ordinals[c.id] for c in library),
+        )
+
+    def search_result(
+        self, *, lang: models.Lang = models.Lang.EN, **criteria: list[str]
+    ) -> "SearchResult":
+        """Search cards, as `search` does, with lazy and paginated results.
+
+        Unlike `search`, the result has no size limit: count, page or iterate it.
+
+        Args:
+            lang: Language to search text dimensions in (defaults to English).
+            **criteria: Dimension filters, e.g. `clan=["Brujah"], sect=["Sabbat"]`.
+                See `search_dimensions` for the valid keys and their values.
+
+        Returns:
+            The matching cards, sorted by name.
+        """
+        return SearchResult(
+            self.table,
+            self.search_index.match(
+                {models.SearchDimension(k): v for k, v in criteria.items()},
+                lang=lang,
+            ),
+        )
+
+    def facets(
+        self,
+        dimensions: Iterable[str] = ("clan", "type", "discipline", "set"),
+        *,
+        lang: models.Lang = models.Lang.EN,
+        **criteria: list[str],
+    ) -> dict[str, dict[str | None, int]]:
+        """Count the matching cards of each value of set dimensions.
+
+        The search runs once, counts are read from the index: for a card browser,
+        the number of cards each filter value would leave.
+
+        Args:
+            dimensions: The set dimensions to count (see `search_dimensions`).
+            lang: Language to search text dimensions in (defaults to English).
+            **criteria: Dimension filters of the search, as `search` takes them.
+                Without filters, all cards are counted.
+
+        Returns:
+            Per dimension, the values and their count, most frequent first.
+        """
+        ordinals = None
+        if criteria:
+            ordinals = self.search_index.match(
+                {models.SearchDimension(k): v for k, v in criteria.items()},
+                lang=lang,
+            )
+        return {
+            dimension.value: counts
+            for dimension, counts in self.search_index.facets(
+                map(models.SearchDimension, dimensions), ordinals
+            ).items()
+        }
+
+    def as_of(
+        self,
+        date: datetime.date | str,
+        format: models.Format | str = models.Format.STANDARD,
+    ) -> "CardView":
+        """The cards legal at a date in a format: printed by then and not banned.
+
+        The view filters through the index and shares the library cards.
+
+        Args:
+            date: The date, or its ISO format.
+            format: The format (defaults to Standard).
+
+        Raises:
+            ValueError: If the date or the format is invalid.
+
+        Returns:
+            A view of the legal cards: look up, complete and search them.
+        """
+        if isinstance(date, str):
+            date = datetime.date.fromisoformat(date)
+        return CardView(self, self.search_index.legal(date, format))
+
     @property
     def search_dimensions(self) -> dict[str, list[str | None]]:
         """The set dimensions and their possible values.
 
-        Text (trie) dimensions are excluded as they have no enumerable choices.
+        Text (trie) and range dimensions are excluded as they have no enumerable
+        choices. Read from `search_catalogue`, computed once.
 
         Returns:
             A mapping of dimension name to its choices (None marks "no value").
         """
         return {
-            dimension.value: self.search_index.choices(dimension)
-            for dimension in models.SearchDimension
-            if dimension not in self.search_index._TRIE_DIMENSIONS
+            dimension: list(counts)
+            for dimension, counts in self.search_catalogue.items()
+        }
+
+    @property
+    def search_catalogue(self) -> dict[str, dict[str | None, int]]:
+        """The set dimensions, their values and the number of cards having each.
+
+        Values are in display order: None first (cards with no value), then
+        sorted. Computed by `index()`, again on first access after `add`, `remove`
+        or `update`.
+
+        Returns:
+            A mapping of dimension name to its values and counts (shared, do not
+            modify them).
+        """
+        return {
+            dimension.value: counts
+            for dimension, counts in self.search_index.dimension_catalogue().items()
         }
 
 
-class i18nTrie[H: Hashable](dict[str, utils.Trie[H]]):
-    """A Trie structure for text search with i18n support."""
+class i18nTrie[H: Hashable](utils.PicklableLocks, dict[str, utils.Trie[H]]):
+    """A Trie structure for text search with i18n support.
+
+    Each language also gets an n-gram index of the full texts, for the "quoted
+    phrase" search mode: exact phrases and infixes, which a Trie can't match. Its
+    trigrams are indexed on the first phrase search of the language.
+
+    Completions are precomputed for a language on its first `complete` (or for all
+    of them by `index_completions`): the top items of every word prefix, so
+    completing a word is a single dict probe. Adding or removing a text refreshes
+    the completions of its prefixes. Searches and completions can run concurrently.
+    """
+
+    #: number of completions precomputed per prefix
+    COMPLETIONS = 10
+
+    def __init__(self) -> None:
+        """Constructor."""
+        super().__init__()
+        self.phrases: dict[str, utils.NgramIndex[H]] = {}
+        #: lang -> word prefix -> top items, as `search_flat` ranks them
+        self.completions: dict[str, dict[str, list[H]]] = {}
+        # guards the precomputation of the completions
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled, completions are built on demand."""
+        state = super().__getstate__()
+        state["completions"] = {}
+        return state
 
     def add(self, text: str, item: H, lang: str = models.Lang.EN) -> None:
         """Add text to the trie.
@@ -141,19 +615,123 @@ class i18nTrie[H: Hashable](dict[str, utils.Trie[H]]):
         """
         if lang not in self:
             self[lang] = utils.Trie[H]()
+            self.phrases[lang] = utils.NgramIndex()
         self[lang].add(text, item)
+        self.phrases[lang].add(text, item)
+        self._refresh_completions(text, lang)
+
+    def remove(self, text: str, item: H, lang: str = models.Lang.EN) -> None:
+        """Remove an item, added with this text, from the trie.
+
+        Args:
+            text: The text the item was added with.
+            item: The item to remove.
+            lang: The language of the text.
+        """
+        if lang in self:
+            self[lang].remove(text, item)
+            self.phrases[lang].remove(item, text)
+            self._refresh_completions(text, lang)
+
+    def _langs(self, lang: str) -> list[str]:
+        """The languages searched for a language: English, plus the language."""
+        langs = [models.Lang.EN] if lang == models.Lang.EN else [models.Lang.EN, lang]
+        return [code for code in langs if code in self]
+
+    def _refresh_completions(self, text: str, lang: str) -> None:
+        """Recompute the precomputed completions of the word prefixes of a text."""
+        if not self.completions:
+            return
+        prefixes = {
+            word[:i]
+            for word in utils.Trie._split(text)
+            for i in range(1, len(word) + 1)
+        }
+        for code, completions in self.completions.items():
+            if lang not in self._langs(code):
+                continue
+            for prefix in prefixes:
+                ranked = self._rank(prefix, code)
+                if ranked:
+                    completions[prefix] = ranked
+                else:
+                    completions.pop(prefix, None)
+
+    def _rank(self, word: str, lang: str) -> list[H]:
+        """The top completions of a single word, as `search_flat` ranks them."""
+        scores = collections.Counter[H]()
+        for code in self._langs(lang):
+            scores.update(self[code].get(word, {}))
+        return [item for item, _ in scores.most_common(self.COMPLETIONS)]
+
+    def index_completions(self) -> None:
+        """Precompute the completions of every word prefix, in every language."""
+        self.completions = {lang: self._completions(lang) for lang in self}
+
+    def _completions(self, lang: str) -> dict[str, list[H]]:
+        """The completions of every word prefix of a language."""
+        prefixes = set().union(*(self[code].keys() for code in self._langs(lang)))
+        return {word: self._rank(word, lang) for word in prefixes}
+
+    def complete(
+        self, text: str, n: int = COMPLETIONS, lang: str = models.Lang.EN
+    ) -> list[H]:
+        """The items best matching text, as `search_flat`, precomputed if possible.
+
+        A single word (the text typed so far) is looked up in the precomputed
+        completions of the language, computed on the first call. Other texts are
+        searched.
+
+        Args:
+            text: The text to complete.
+            n: The number of items to return.
+            lang: The language of the text.
+        """
+        words = utils.Trie._split(text)
+        if len(words) != 1 or n > self.COMPLETIONS or '"' in text:
+            return self.search_flat(text, n, lang)
+        completions = self.completions.get(lang)
+        if completions is None and lang in self:
+            with self._lock:
+                completions = self.completions.get(lang)
+                if completions is None:
+                    completions = self.completions[lang] = self._completions(lang)
+        ret = (completions or {}).get(words[0])
+        if ret is None:
+            ret = self._rank(words[0], lang)
+        return ret[:n]
 
     def search(self, text: str, lang: str = models.Lang.EN) -> collections.Counter[H]:
         """Search text in the trie.
 
+        Words match the start of words. A "quoted phrase" matches anywhere in the
+        text, as is (case and accents aside): a phrase, or part of a word. Only
+        items matching all words and phrases are returned, a phrase scoring its
+        length.
+
         Args:
             text: The text to search.
             lang: The language of the text.
         """
-        result = self[models.Lang.EN].search(text)
-        if lang != models.Lang.EN and lang in self:
-            result.update(self[lang].search(text))
-        return result
+        langs = self._langs(lang)
+        phrases = [p for p in RE_PHRASE.findall(text) if p.strip()]
+        words = RE_PHRASE.sub(" ", text)
+        result: collections.Counter[H] | None = None
+        if words.strip() or not phrases:
+            result = collections.Counter[H]()
+            for code in langs:
+                result.update(self[code].search(words))
+        for phrase in phrases:
+            matches = set[H]().union(
+                *(self.phrases[code].search(phrase) for code in langs)
+            )
+            if result is None:
+                result = collections.Counter[H](dict.fromkeys(matches, len(phrase)))
+            else:
+                result = collections.Counter[H](
+                    {k: v + len(phrase) for k, v in result.items() if k in matches}
+                )
+        return result or collections.Counter[H]()
 
     def search_flat(
         self, text: str, n: int | None = None, lang: str = models.Lang.EN
@@ -168,7 +746,226 @@ class i18nTrie[H: Hashable](dict[str, utils.Trie[H]]):
         return [a[0] for a in self.search(text, lang).most_common(n)]
 
 
-class CardSearch:
+class RulingEntry(NamedTuple):
+    """A ruling stored once, with the ids of the cards it rules on."""
+
+    ruling: models.Ruling
+    #: several cards for a group ruling
+    cards: list[int]
+
+
+class RulingIndex:
+    """The rulings, each stored once, indexed for search.
+
+    A group ruling applies to every card of the group: the cards each get their
+    own copy (prefixed as the group says), the index keeps each text once. Rulings are
+    indexed by text (word prefixes, or a "quoted phrase"), by reference (its
+    label, or its author alone), by the cards they mention and by group.
+
+    The cards of the library keep it in sync: `CardDict.add` indexes the rulings
+    of a card, `CardDict.remove` drops the card from its rulings.
+    """
+
+    def __init__(self, cards: Iterable[models.Card] = ()) -> None:
+        """Index the rulings of cards, see `add_cards`."""
+        #: ruling number -> ruling
+        self.entries: dict[int, RulingEntry] = {}
+        # the number of the next ruling added
+        self.count = 0
+        #: card id -> numbers of the rulings on it
+        self.cards: dict[int, set[int]] = {}
+        self.text = i18nTrie[int]()
+        #: reference label or author -> ruling numbers
+        self.references: dict[str, set[int]] = {}
+        #: mentioned card id -> ruling numbers
+        self.mentions: dict[int, set[int]] = {}
+        #: group name -> ruling numbers
+        self.groups: dict[str, set[int]] = {}
+        self.add_cards(cards)
+
+    def __len__(self) -> int:
+        """Return the number of rulings."""
+        return len(self.entries)
+
+    def add(self, ruling: models.Ruling, cards: Iterable[int]) -> int:
+        """Index a ruling.
+
+        Args:
+            ruling: The ruling.
+            cards: The ids of the cards it rules on.
+
+        Returns:
+            The ruling number.
+        """
+        number = self.count
+        self.count += 1
+        self.entries[number] = RulingEntry(ruling, list(dict.fromkeys(cards)))
+        for card_id in self.entries[number].cards:
+            self.cards.setdefault(card_id, set()).add(number)
+        # references and card markup are searched apart, not as words
+        self.text.add(RE_RULING_MARKUP.sub(" ", ruling.text), number)
+        for reference in ruling.references:
+            self.references.setdefault(reference.label, set()).add(number)
+            author = reference.label.split()[0]
+            self.references.setdefault(author, set()).add(number)
+        for card in ruling.cards:
+            self.mentions.setdefault(card.id, set()).add(number)
+        if ruling.group:
+            self.groups.setdefault(ruling.group, set()).add(number)
+        return number
+
+    def add_cards(self, cards: Iterable[models.Card]) -> None:
+        """Index the rulings of cards, each group ruling once per text.
+
+        Each card of a group has its copy of a group ruling: the copies of same
+        text are merged, already indexed or not. A copy worded for its card
+        (prefixed, e.g. "[for]/[thn]", or overridden) is a ruling of its own.
+        """
+        # (group, text) -> ruling number, of the group rulings indexed
+        numbers = {
+            (entry.ruling.group, entry.ruling.text): number
+            for number, entry in self.entries.items()
+            if entry.ruling.group
+        }
+        for card in cards:
+            for ruling in card.rulings:
+                if not ruling.group:
+                    self.add(ruling, [card.id])
+                    continue
+                number = numbers.get((ruling.group, ruling.text))
+                if number is None:
+                    numbers[ruling.group, ruling.text] = self.add(ruling, [card.id])
+                elif card.id not in self.entries[number].cards:
+                    self.entries[number].cards.append(card.id)
+                    self.cards.setdefault(card.id, set()).add(number)
+
+    def remove(self, card_id: int) -> None:
+        """Remove a card from its rulings, and the rulings left on no card."""
+        for number in self.cards.pop(card_id, set()):
+            entry = self.entries[number]
+            entry.cards.remove(card_id)
+            if entry.cards:
+                continue
+            del self.entries[number]
+            ruling = entry.ruling
+            self.text.remove(RE_RULING_MARKUP.sub(" ", ruling.text), number)
+            keys: list[tuple[dict[Any, set[int]], Any]] = []
+            for reference in ruling.references:
+                keys.append((self.references, reference.label))
+                keys.append((self.references, reference.label.split()[0]))
+            keys.extend((self.mentions, card.id) for card in ruling.cards)
+            if ruling.group:
+                keys.append((self.groups, ruling.group))
+            for index, key in keys:
+                numbers = index.get(key)
+                if numbers is not None:
+                    numbers.discard(number)
+                    if not numbers:
+                        del index[key]
+
+    def search(
+        self,
+        text: str | None = None,
+        *,
+        reference: str | None = None,
+        card: models.CardMinimal | int | None = None,
+        group: str | None = None,
+    ) -> list[RulingEntry]:
+        """Search rulings, all the criteria given must match.
+
+        Args:
+            text: Words (matching the start of words) or a "quoted phrase".
+            reference: A reference label (``"LSJ 20080125"``) or author (``"LSJ"``).
+            card: A card mentioned in the ruling, or its id.
+            group: The name of a group of cards.
+
+        Returns:
+            The matching rulings, in the order they were added.
+        """
+        if isinstance(card, models.CardMinimal):
+            card = card.id
+        found: list[set[int]] = []
+        if text is not None:
+            found.append(set(self.text.search(text)))
+        if reference is not None:
+            found.append(self.references.get(reference.strip("[]"), set()))
+        if card is not None:
+            found.append(self.mentions.get(card, set()))
+        if group is not None:
+            found.append(self.groups.get(group, set()))
+        if not found:
+            return [self.entries[number] for number in sorted(self.entries)]
+        numbers = set(found[0]).intersection(*found[1:])
+        return [self.entries[number] for number in sorted(numbers)]
+
+
+class Requirement(NamedTuple):
+    """What a crypt card needs to play a library card (empty for no requirement).
+
+    A crypt card must have one of the clans, one of the paths, one of the titles,
+    and one of the disciplines, or all of them for a combo.
+    """
+
+    clans: frozenset[str] = frozenset()
+    paths: frozenset[str] = frozenset()
+    disciplines: frozenset[str] = frozenset()
+    combo: bool = False
+    titles: frozenset[str] = frozenset()
+
+
+class FeatureMatrix:
+    """A dense cards x features matrix, for vectorized analytics.
+
+    One row per card, in card id order, one column per feature:
+
+    - ``"dimension:value"`` for each value of the type, clan, sect, discipline,
+      bonus and trait dimensions: 1 if the card has it, 0 otherwise.
+      Disciplines have a column per discipline (lowercase), 1 for inferior
+      (or a library card requiring it), 2 for superior.
+    - the capacity, pool, blood and conviction costs, NaN when the card has none.
+
+    The matrix is shared (cached): copy it before modifying it.
+    """
+
+    def __init__(self, ids: numpy.ndarray, columns: list[str], values: numpy.ndarray):
+        """Constructor.
+
+        Args:
+            ids: The card ids, sorted: the rows.
+            columns: The features names.
+            values: The matrix, float32.
+        """
+        self.ids = ids
+        self.columns = columns
+        self.values = values
+        #: feature name -> column
+        self.positions = {name: i for i, name in enumerate(columns)}
+
+    def __len__(self) -> int:
+        """Return the number of cards (rows)."""
+        return len(self.ids)
+
+    def column(self, name: str) -> numpy.ndarray:
+        """The values of a feature for all cards.
+
+        Raises:
+            KeyError: If there is no such feature.
+        """
+        return self.values[:, self.positions[name]]
+
+    def row(self, card_id: int) -> numpy.ndarray:
+        """The features of a card.
+
+        Raises:
+            KeyError: If the card is not in the matrix.
+        """
+        i = int(numpy.searchsorted(self.ids, card_id))
+        if i >= len(self.ids) or self.ids[i] != card_id:
+            raise KeyError(card_id)
+        return self.values[i]
+
+
+class CardSearch(utils.PicklableLocks):
     """A class indexing cards over multiple dimensions, for search purposes.
 
     Set dimensions are simple sets indexing specific values.
@@ -179,6 +976,13 @@ class CardSearch:
 
     Trie dimensions provide prefix-based case insensitive text search.
     As for set dimensions, only card with words matching all prefixes are returned.
+    A "quoted" value is a phrase, matched as is anywhere in the text (infixes too).
+
+    Range dimensions (numbers and dates) are sorted arrays, searched with a
+    comparison (`">=8"`, `"<2000-01-01"`) or an inclusive range (`"8..11"`).
+    A value without an operator matches exactly. Multiple values are an OR.
+
+    The indexes refer to the cards by their ordinal in the card table.
     """
 
     _TRIE_DIMENSIONS = [
@@ -188,12 +992,37 @@ class CardSearch:
     ]
     # for those dimensions, all values must match, for others, any value can match (or).
     _INTERSECT_SET_DIMENSIONS = ["trait", "discipline", "bonus"]
+    #: capacity is both a set and a range dimension, the others are ranges only
+    _RANGE_DIMENSIONS = [
+        models.SearchDimension.CAPACITY,
+        models.SearchDimension.POOL_COST,
+        models.SearchDimension.BLOOD_COST,
+        models.SearchDimension.CONVICTION_COST,
+        models.SearchDimension.LEGAL,
+        models.SearchDimension.BANNED,
+    ]
+    _RANGE_ONLY_DIMENSIONS = _RANGE_DIMENSIONS[1:]
+    #: the columns of the feature matrix: values of set dimensions, then numbers
+    _FEATURE_SETS = [
+        models.SearchDimension.TYPE,
+        models.SearchDimension.CLAN,
+        models.SearchDimension.SECT,
+        models.SearchDimension.DISCIPLINE,
+        models.SearchDimension.BONUS,
+        models.SearchDimension.TRAIT,
+    ]
+    _FEATURE_NUMBERS = _RANGE_DIMENSIONS[:4]
 
-    def __init__(self) -> None:
-        """Constructor."""
-        self.name = i18nTrie[models.Card]()
-        self.card_text = i18nTrie[models.Card]()
-        self.flavor_text = i18nTrie[models.Card]()
+    def __init__(self, table: CardTable) -> None:
+        """Constructor.
+
+        Args:
+            table: The table of the cards to index, giving their ordinals.
+        """
+        self.table = table
+        self.name = i18nTrie[int]()
+        self.card_text = i18nTrie[int]()
+        self.flavor_text = i18nTrie[int]()
         self.kind: SetIndex = collections.defaultdict(set)
         self.type: SetIndex = collections.defaultdict(set)
         self.sect: SetIndex = collections.defaultdict(set)
@@ -207,41 +1036,440 @@ class CardSearch:
         self.discipline: SetIndex = collections.defaultdict(set)
         self.artist: SetIndex = collections.defaultdict(set)
         self.set: SetIndex = collections.defaultdict(set)
+        self.format: SetIndex = collections.defaultdict(set)
         self.rarity: SetIndex = collections.defaultdict(set)
         self.precon: SetIndex = collections.defaultdict(set)
         self.bonus: SetIndex = collections.defaultdict(set)
+        self.ranges: dict[models.SearchDimension, utils.RangeIndex[int]] = {
+            dimension: utils.RangeIndex() for dimension in self._RANGE_DIMENSIONS
+        }
+        #: card id -> the values it is indexed under, to remove it as it was added
+        self.values: dict[int, dict[models.SearchDimension, DimensionValues]] = {}
+        #: card id -> the features derived from its text, computed once
+        self.features: dict[int, models.CardFeatures] = {}
+        #: lang -> TF-IDF matrix of the card texts, built on demand when cards change
+        self.similarity: dict[str, utils.TfIdf[int]] = {}
+        #: cards x features matrix, rebuilt on demand when cards change
+        self.matrix: FeatureMatrix | None = None
+        #: set dimension -> its values and their card count, in display order
+        self.catalogue: dict[models.SearchDimension, dict[str | None, int]] = {}
+        # guards the rebuild of the similarity and feature matrices and catalogue
+        self._lock = threading.Lock()
+        #: library card id -> its requirement
+        self.requirement_of: dict[int, Requirement] = {}
+        #: requirement -> ordinals of the library cards having it
+        self.requirements: dict[Requirement, set[int]] = {}
+        #: requirement -> ordinals of the crypt cards meeting it, by `index_playability`
+        self.players: dict[Requirement, set[int]] = {}
+        #: card id -> ids of the cards named in its text, per language
+        self.mentions: dict[int, dict[str, set[int]]] = {}
+        #: card id -> ids of the cards naming it in their text, per language
+        self.mentioned_in: dict[int, dict[str, set[int]]] = {}
+        #: card id -> (ruling index, card id) of the cards named in its rulings
+        self.ruling_mentions: dict[int, list[tuple[int, int]]] = {}
+        #: card id -> (card id, ruling index) of the rulings naming it
+        self.ruled_in: dict[int, set[tuple[int, int]]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled, matrices are rebuilt on demand."""
+        state = super().__getstate__()
+        state["similarity"] = {}
+        state["matrix"] = None
+        return state
 
     def add(self, card: models.Card) -> None:
-        """Add a card to the right search indexes."""
+        """Add a card to the right search indexes (replacing a card of same id).
+
+        The card must be in the table.
+        """
+        self.remove(card)
+        ordinal = self.table.ordinals[card.id]
+        self.values[card.id] = {}
+        self.features[card.id] = features = card_features(card)
+        for dimension, index in self.ranges.items():
+            key = get_range_value(card, dimension)
+            if key is not None:
+                index.add(key, ordinal)
         for dimension in models.SearchDimension:
-            values = get_dimension_values(card, dimension)
+            if dimension in self._RANGE_ONLY_DIMENSIONS:
+                continue
+            values = get_dimension_values(card, dimension, features)
+            self.values[card.id][dimension] = values
             if dimension in self._TRIE_DIMENSIONS:
                 assert isinstance(values, dict)
                 for lang, values_list in values.items():
                     for value in values_list:
-                        getattr(self, dimension.value).add(value, card, lang)
+                        getattr(self, dimension.value).add(value, ordinal, lang)
             else:
                 assert isinstance(values, list)
                 if not values:
-                    getattr(self, dimension.value)[None].add(card)
+                    getattr(self, dimension.value)[None].add(ordinal)
                 else:
                     for value in values:
-                        getattr(self, dimension.value)[value].add(card)
+                        getattr(self, dimension.value)[value].add(ordinal)
+        self._add_mentions(card)
+        self.catalogue = {}
+        if isinstance(card, models.LibraryCard):
+            requirement = get_requirement(card, features)
+            self.requirement_of[card.id] = requirement
+            self.requirements.setdefault(requirement, set()).add(ordinal)
+            if self.players and requirement not in self.players:
+                self.players[requirement] = self._players(requirement)
+        elif self.players:
+            # a new crypt card may meet any requirement
+            for requirement, players in self.players.items():
+                if self._meets(requirement, ordinal):
+                    players.add(ordinal)
+
+    def remove(self, card: models.Card) -> None:
+        """Remove a card from the search indexes, if present.
+
+        The card is removed from the values it was indexed under, even if it has
+        changed since: update a card in place, then `add` it again.
+        """
+        indexed = card.id in self.values
+        self.features.pop(card.id, None)
+        # replaced, not cleared: a concurrent `similar` keeps the matrices it read
+        self.similarity = {}
+        self.matrix = None
+        self.catalogue = {}
+        ordinal = self.table.ordinals.get(card.id)
+        if ordinal is not None:
+            for index in self.ranges.values():
+                index.remove(ordinal)
+        for dimension, values in self.values.pop(card.id, {}).items():
+            if dimension in self._TRIE_DIMENSIONS:
+                assert isinstance(values, dict)
+                for lang, values_list in values.items():
+                    for value in values_list:
+                        getattr(self, dimension.value).remove(value, ordinal, lang)
+            else:
+                assert isinstance(values, list)
+                index: SetIndex = getattr(self, dimension.value)
+                for value in values or [None]:
+                    if value not in index:
+                        continue
+                    index[value].discard(ordinal)
+                    if not index[value]:
+                        del index[value]
+        self._remove_mentions(card.id)
+        requirement = self.requirement_of.pop(card.id, None)
+        if requirement is not None:
+            library = self.requirements[requirement]
+            library.discard(ordinal)
+            if not library:
+                del self.requirements[requirement]
+                self.players.pop(requirement, None)
+        elif indexed and self.players:
+            for players in self.players.values():
+                players.discard(ordinal)
+
+    def index_rulings(self, card: models.Card) -> None:
+        """Index the cards named in the rulings of a card again, after they changed."""
+        self._remove_ruling_mentions(card.id)
+        self._add_ruling_mentions(card)
+
+    def _add_mentions(self, card: models.Card) -> None:
+        """Index the cards named in a card text, in every language, and rulings."""
+        mentions: dict[str, set[int]] = {models.Lang.EN: {c.id for c in card.cards}}
+        for lang, translation in card.i18n.items():
+            mentions[lang] = {c.id for c in translation.cards}
+        self.mentions[card.id] = mentions
+        for lang, targets in mentions.items():
+            for target in targets:
+                self.mentioned_in.setdefault(target, {}).setdefault(lang, set()).add(
+                    card.id
+                )
+        self._add_ruling_mentions(card)
+
+    def _add_ruling_mentions(self, card: models.Card) -> None:
+        """Index the cards named in the rulings of a card."""
+        ruling_mentions = [
+            (index, c.id)
+            for index, ruling in enumerate(card.rulings)
+            for c in ruling.cards
+            # a ruling of a card naming that card does not reference it
+            if c.id != card.id
+        ]
+        self.ruling_mentions[card.id] = ruling_mentions
+        for index, target in ruling_mentions:
+            self.ruled_in.setdefault(target, set()).add((card.id, index))
+
+    def _remove_mentions(self, card_id: int) -> None:
+        """Remove the references of a card, as they were added."""
+        for lang, targets in self.mentions.pop(card_id, {}).items():
+            for target in targets:
+                sources = self.mentioned_in[target][lang]
+                sources.discard(card_id)
+                if not sources:
+                    del self.mentioned_in[target][lang]
+                if not self.mentioned_in[target]:
+                    del self.mentioned_in[target]
+        self._remove_ruling_mentions(card_id)
+
+    def _remove_ruling_mentions(self, card_id: int) -> None:
+        """Remove the cards named in the rulings of a card, as they were added."""
+        for index, target in self.ruling_mentions.pop(card_id, []):
+            rulings = self.ruled_in[target]
+            rulings.discard((card_id, index))
+            if not rulings:
+                del self.ruled_in[target]
+
+    def index_playability(self) -> None:
+        """Match every library card requirement with the crypt cards meeting it."""
+        self.players = {
+            requirement: self._players(requirement) for requirement in self.requirements
+        }
+
+    def _players(self, requirement: Requirement) -> set[int]:
+        """The ordinals of the crypt cards meeting a requirement, from the index."""
+        ret = set(self.kind.get(models.Card.Kind.CRYPT, set()))
+        for values, index in [
+            (requirement.clans, self.clan),
+            (requirement.paths, self.path),
+            (requirement.titles, self.title),
+        ]:
+            if values:
+                ret &= set[int]().union(*(index.get(v, set()) for v in values))
+        if requirement.disciplines:
+            # crypt cards are indexed under the inferior level of their disciplines
+            sets = [self.discipline.get(d, set()) for d in requirement.disciplines]
+            if requirement.combo:
+                ret = ret.intersection(*sets)
+            else:
+                ret &= set[int]().union(*sets)
+        return ret
+
+    def _meets(self, requirement: Requirement, ordinal: int) -> bool:
+        """Check if an indexed crypt card meets a requirement, as `_players` does."""
+        for values, index in [
+            (requirement.clans, self.clan),
+            (requirement.paths, self.path),
+            (requirement.titles, self.title),
+        ]:
+            if values and not any(ordinal in index.get(v, ()) for v in values):
+                return False
+        if requirement.disciplines:
+            found = (
+                ordinal in self.discipline.get(d, ()) for d in requirement.disciplines
+            )
+            return all(found) if requirement.combo else any(found)
+        return True
+
+    def playable(self, crypt: Iterable[int]) -> set[int]:
+        """The ordinals of the library cards any of the crypt cards can play.
+
+        Args:
+            crypt: The ordinals of the crypt cards (a whole crypt, or a single one).
+        """
+        crypt = set(crypt)
+        ret = set[int]()
+        for requirement, players in self.players.items():
+            if not players.isdisjoint(crypt):
+                ret |= self.requirements[requirement]
+        return ret
+
+    def players_of(self, library: Iterable[int]) -> set[int]:
+        """The ordinals of the crypt cards able to play any of the library cards.
+
+        Args:
+            library: The ordinals of the library cards.
+        """
+        requirements = {
+            self.requirement_of[card_id]
+            for card_id in (self.table[ordinal].id for ordinal in library)
+            if card_id in self.requirement_of
+        }
+        return set[int]().union(*(self.players.get(r, set()) for r in requirements))
+
+    def index_similarity(self) -> None:
+        """Build the TF-IDF matrices of the card texts, one per language."""
+        texts: dict[str, list[tuple[int, str]]] = collections.defaultdict(list)
+        for card_id, values in self.values.items():
+            ordinal = self.table.ordinals[card_id]
+            text = values[models.SearchDimension.CARD_TEXT]
+            assert isinstance(text, dict)
+            for lang, lang_texts in text.items():
+                texts[lang].extend((ordinal, t) for t in lang_texts)
+        self.similarity = {lang: utils.TfIdf(items) for lang, items in texts.items()}
+
+    def similar(
+        self, card: models.Card, n: int = 10, lang: models.Lang = models.Lang.EN
+    ) -> list[models.Card]:
+        """The cards whose text is most similar to the card's (TF-IDF cosine).
+
+        Cards without a translation are compared in English. The matrices are built
+        on the first call, and again if the cards have changed since.
+        """
+        similarity = self.similarity
+        if not similarity:
+            with self._lock:
+                if not self.similarity:
+                    self.index_similarity()
+                similarity = self.similarity
+        ordinal = self.table.ordinals.get(card.id)
+        if ordinal is None:
+            return []
+        matrix = similarity.get(lang)
+        if matrix is None or ordinal not in matrix:
+            matrix = similarity.get(models.Lang.EN)
+        if matrix is None or ordinal not in matrix:
+            return []
+        return [self.table[o] for o, _ in matrix.similar(ordinal, n)]
+
+    def feature_matrix(self) -> FeatureMatrix:
+        """The cards x features matrix, built once, rebuilt if the cards changed."""
+        matrix = self.matrix
+        if matrix is None:
+            with self._lock:
+                if self.matrix is None:
+                    self.matrix = self._feature_matrix()
+                matrix = self.matrix
+        return matrix
+
+    def _feature_matrix(self) -> FeatureMatrix:
+        """Build the features matrix a column at a time, from the set and range indexes.
+
+        The indexes hold the values `get_dimension_values` and `get_range_value` give.
+        """
+        ids = sorted(self.values)
+        # ordinal -> row
+        rows = numpy.full(len(self.table.slots), -1, dtype=numpy.intp)
+        rows[[self.table.ordinals[card_id] for card_id in ids]] = numpy.arange(len(ids))
+        # column -> (row indexes, value) pairs to set
+        cells: dict[str, list[tuple[numpy.ndarray, int]]] = {}
+        for dimension in self._FEATURE_SETS:
+            index: SetIndex = getattr(self, dimension.value)
+            for value, ordinals in index.items():
+                if value is None or not ordinals:
+                    continue
+                level = 1
+                if dimension == models.SearchDimension.DISCIPLINE:
+                    # a column per discipline: 1 for inferior, 2 for superior
+                    level = 2 if value.isupper() else 1
+                    value = value.lower()
+                cells.setdefault(f"{dimension.value}:{value}", []).append(
+                    (rows[list(ordinals)], level)
+                )
+        columns = sorted(cells)
+        columns.extend(dimension.value for dimension in self._FEATURE_NUMBERS)
+        values = numpy.zeros((len(ids), len(columns)), dtype=numpy.float32)
+        for column, name in enumerate(columns[: len(cells)]):
+            for indexes, level in cells[name]:
+                values[indexes, column] = numpy.maximum(values[indexes, column], level)
+        for column, dimension in enumerate(self._FEATURE_NUMBERS, len(cells)):
+            # no value (a crypt card cost, an "X" cost) is NaN
+            values[:, column] = numpy.nan
+            ranges = self.ranges[dimension]
+            values[rows[ranges.references], column] = ranges.keys
+        return FeatureMatrix(numpy.array(ids, dtype=numpy.int64), columns, values)
 
     def choices(self, dimension: models.SearchDimension) -> list[str | None]:
         """Get the choices for a dimension (None marks cards with no value)."""
         if dimension in self._TRIE_DIMENSIONS:
             raise ValueError(f"{dimension.value} is a trie dimension")
+        elif dimension in self._RANGE_ONLY_DIMENSIONS:
+            raise ValueError(f"{dimension.value} is a range dimension")
         else:
-            res: list[str | None] = (
-                [None] if None in getattr(self, dimension.value) else []
-            )
-            res.extend(
+            return list(self.dimension_catalogue()[dimension])
+
+    def index_catalogue(self) -> None:
+        """Compute the values of every set dimension and their card count."""
+        catalogue: dict[models.SearchDimension, dict[str | None, int]] = {}
+        for dimension in models.SearchDimension:
+            if (
+                dimension in self._TRIE_DIMENSIONS
+                or dimension in self._RANGE_ONLY_DIMENSIONS
+            ):
+                continue
+            index: SetIndex = getattr(self, dimension.value)
+            counts: dict[str | None, int] = {}
+            if None in index:
+                counts[None] = len(index[None])
+            for value in sorted(k for k in index.keys() if k is not None):
+                counts[value] = len(index[value])
+            catalogue[dimension] = counts
+        self.catalogue = catalogue
+
+    def dimension_catalogue(
+        self,
+    ) -> dict[models.SearchDimension, dict[str | None, int]]:
+        """The set dimensions, their values (in display order) and card counts.
+
+        Computed by `index_catalogue`, computed again once if cards have changed.
+        """
+        catalogue = self.catalogue
+        if not catalogue:
+            with self._lock:
+                if not self.catalogue:
+                    self.index_catalogue()
+                catalogue = self.catalogue
+        return catalogue
+
+    def legal(
+        self,
+        date: datetime.date,
+        format: models.Format | str = models.Format.STANDARD,
+    ) -> set[int]:
+        """The ordinals of the cards legal at a date in a format.
+
+        A card is legal from its first print on, until its ban.
+
+        Args:
+            date: The date.
+            format: The format (defaults to Standard, every card).
+
+        Raises:
+            ValueError: If the format is not a `models.Format` value.
+        """
+        format = models.Format(format)
+        ret = self.ranges[models.SearchDimension.LEGAL].search(None, date)
+        ret -= self.ranges[models.SearchDimension.BANNED].search(None, date)
+        return ret & self.format.get(format, set())
+
+    def facets(
+        self,
+        dimensions: Iterable[models.SearchDimension],
+        ordinals: Collection[int] | None = None,
+    ) -> dict[models.SearchDimension, dict[str | None, int]]:
+        """Count the cards of a result having each value of set dimensions.
+
+        Counts are read from the index, one set intersection per value: no search
+        is run. The count of a value is the number of cards the result would keep
+        if filtered on that value.
+
+        Args:
+            dimensions: The set dimensions to count values of.
+            ordinals: The ordinals of the result, defaults to None for all cards.
+
+        Returns:
+            Per dimension, the values found in the result and their count, most
+            frequent first (None counts the cards with no value).
+        """
+        if ordinals is not None and not isinstance(ordinals, (set, frozenset)):
+            ordinals = set(ordinals)
+        ret: dict[models.SearchDimension, dict[str | None, int]] = {}
+        for dimension in dimensions:
+            if dimension in self._TRIE_DIMENSIONS:
+                raise ValueError(f"{dimension.value} is a trie dimension")
+            elif dimension in self._RANGE_ONLY_DIMENSIONS:
+                raise ValueError(f"{dimension.value} is a range dimension")
+            index: SetIndex = getattr(self, dimension.value)
+            if ordinals is None:
+                counts = {value: len(cards) for value, cards in index.items()}
+            else:
+                counts = {
+                    value: count
+                    for value, cards in index.items()
+                    if (count := len(ordinals & cards))
+                }
+            ret[dimension] = dict(
                 sorted(
-                    k for k in getattr(self, dimension.value).keys() if k is not None
+                    counts.items(),
+                    key=lambda item: (-item[1], item[0] is None, item[0] or ""),
                 )
             )
-            return res
+        return ret
 
     def search(
         self,
@@ -259,16 +1487,50 @@ class CardSearch:
         Returns:
             The list of cards matching the filters.
         """
-        ret = set[models.Card]()
+        return sorted(
+            (self.table[o] for o in self.match(filters, n, lang)),
+            key=lambda x: (x.printed_name, x.id),
+        )[:n]
+
+    def match(
+        self,
+        filters: dict[models.SearchDimension, list[str]],
+        n: int | None = None,
+        lang: models.Lang = models.Lang.EN,
+    ) -> set[int]:
+        """The ordinals of the cards matching the filters, all cards without filters.
+
+        Args:
+            filters: The filters to apply.
+            n: The number of best matches to keep per text value, defaults to None
+                to keep them all.
+            lang: The language to search in (only matters for trie dimensions).
+        """
+        if not filters:
+            return {o for o, card in enumerate(self.table.slots) if card is not None}
+        ret = set[int]()
         first = True
         for dimension, values in filters.items():
             # allow dim="value" as shorthand for dim=["value"]
             if isinstance(values, str):
                 values = [values]
-            sub_result = set[models.Card]()
+            sub_result = set[int]()
             # for trie dimensions, multiple values is an OR
             # Trie does intersection when multiple words are in a single value
-            if dimension in self._TRIE_DIMENSIONS:
+            if dimension in self._RANGE_ONLY_DIMENSIONS or (
+                dimension in self.ranges and any(map(is_range, values))
+            ):
+                for value in values:
+                    low, high, low_inclusive, high_inclusive = parse_range(
+                        dimension, value
+                    )
+                    sub_result |= self.ranges[dimension].search(
+                        low,
+                        high,
+                        low_inclusive=low_inclusive,
+                        high_inclusive=high_inclusive,
+                    )
+            elif dimension in self._TRIE_DIMENSIONS:
                 for value in values:
                     if not value:
                         continue
@@ -280,7 +1542,7 @@ class CardSearch:
                 for value in values:
                     if not value and value is not None:
                         continue
-                    internal_result = getattr(self, dimension.value)[value]
+                    internal_result = getattr(self, dimension.value).get(value, set())
                     if sub_first:
                         sub_result = set(internal_result)
                     elif dimension in self._INTERSECT_SET_DIMENSIONS:
@@ -293,16 +1555,205 @@ class CardSearch:
             else:
                 ret &= sub_result
             first = False
-        return sorted(ret, key=lambda x: x.printed_name)[:n]
+        return ret
+
+
+class References(NamedTuple):
+    """The cards and rulings naming a card."""
+
+    #: cards naming it in their text
+    cards: list[models.Card]
+    #: rulings naming it, with the card each one rules on
+    rulings: list[tuple[models.Card, models.Ruling]]
+
+
+class Page(NamedTuple):
+    """A page of search results, and the cursor of the next page (None if last)."""
+
+    cards: list[models.Card]
+    cursor: str | None
+
+
+class SearchResult:
+    """The cards matching a search, sorted by name, computed as needed.
+
+    It only holds the matching ordinals: counting them takes no sort, and cards
+    are only looked up for the ids or pages read.
+
+    Pages are addressed by cursor, the position after the last card of a page.
+    A cursor stays valid in a later search (the cards having changed since):
+    the next page starts after the card the cursor was made from.
+    """
+
+    def __init__(self, table: CardTable, ordinals: Iterable[int]) -> None:
+        """Constructor.
+
+        Args:
+            table: The table of the cards.
+            ordinals: The ordinals of the matching cards.
+        """
+        self.table = table
+        self.ordinals = frozenset(ordinals)
+        self._order: list[int] | None = None
+        self._keys: list[tuple[str, int]] | None = None
+
+    def _key(self, ordinal: int) -> tuple[str, int]:
+        """Sort key of a card: its name, then its id for a stable order."""
+        card = self.table[ordinal]
+        return (card.printed_name, card.id)
+
+    @property
+    def order(self) -> list[int]:
+        """The ordinals, in card name order (sorted on first access)."""
+        if self._order is None:
+            self._order = sorted(self.ordinals, key=self._key)
+        return self._order
+
+    def count(self) -> int:
+        """Return the number of matching cards."""
+        return len(self.ordinals)
+
+    def __len__(self) -> int:
+        """Return the number of matching cards."""
+        return len(self.ordinals)
+
+    def __bool__(self) -> bool:
+        """True if any card matches."""
+        return bool(self.ordinals)
+
+    def __contains__(self, card: object) -> bool:
+        """Check if a card matches."""
+        if not isinstance(card, models.Card):
+            return False
+        ordinal = self.table.ordinals.get(card.id)
+        return ordinal in self.ordinals
+
+    def __iter__(self) -> Iterator[models.Card]:
+        """Iterate over the matching cards, by name."""
+        return (self.table[o] for o in self.order)
+
+    def ids(self) -> list[int]:
+        """The ids of the matching cards, by card name."""
+        return [self.table[o].id for o in self.order]
+
+    def page(self, size: int, cursor: str | None = None) -> Page:
+        """A page of matching cards.
+
+        Args:
+            size: The number of cards in the page.
+            cursor: The cursor given by the previous page, None for the first one.
+
+        Raises:
+            ValueError: If the cursor is not one a page gave.
+        """
+        start = 0
+        if cursor:
+            try:
+                card_id, name = cursor.split(":", 1)
+                key = (name, int(card_id))
+            except ValueError:
+                raise ValueError(f"invalid cursor: {cursor!r}") from None
+            if self._keys is None:
+                self._keys = [self._key(o) for o in self.order]
+            start = bisect.bisect_right(self._keys, key)
+        cards = [self.table[o] for o in self.order[start : start + size]]
+        next_cursor = None
+        if cards and start + size < len(self.order):
+            next_cursor = f"{cards[-1].id}:{cards[-1].printed_name}"
+        return Page(cards, next_cursor)
+
+
+class CardView:
+    """Part of a library (e.g. the cards legal at a date), sharing its cards.
+
+    Lookups, completions and searches run on the library and its index, then keep
+    the cards of the view: nothing is copied or indexed again.
+    """
+
+    def __init__(self, library: CardDict, ordinals: Iterable[int]) -> None:
+        """Constructor.
+
+        Args:
+            library: The cards library.
+            ordinals: The ordinals of the cards in the view.
+        """
+        self.library = library
+        self.ordinals = frozenset(ordinals)
+
+    def __getitem__(self, key: int | str) -> models.Card:
+        """Get a card as the library does, if in the view."""
+        card = self.library[key]
+        if self.library.table.ordinals[card.id] not in self.ordinals:
+            raise KeyError(key)
+        return card
+
+    def get(
+        self, key: int | str, default: models.Card | None = None
+    ) -> models.Card | None:
+        """Get a card if in the view, else the default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a card (or a card id or name) is in the view."""
+        if isinstance(key, models.Card):
+            key = key.id
+        if not isinstance(key, (int, str)):
+            return False
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        """Return the number of cards in the view."""
+        return len(self.ordinals)
+
+    def cards(self) -> Iterator[models.Card]:
+        """Iterate over the cards of the view, in id order."""
+        table = self.library.table
+        return (card for card in table if table.ordinals[card.id] in self.ordinals)
+
+    def __iter__(self) -> Iterator[models.Card]:
+        """Iterate over the cards of the view, in id order."""
+        return self.cards()
+
+    def complete(self, text: str, lang: str = models.Lang.EN) -> list[models.Card]:
+        """Complete a card name, as `CardDict.complete`, among the view cards."""
+        scores = self.library.search_index.name.search(text, lang)
+        ordinals = [o for o, _ in scores.most_common() if o in self.ordinals]
+        return [self.library.table[o] for o in ordinals[:10]]
+
+    def search(
+        self,
+        *,
+        n: int | None = 100,
+        lang: models.Lang = models.Lang.EN,
+        **criteria: list[str],
+    ) -> list[models.Card]:
+        """Search cards, as `CardDict.search`, among the view cards."""
+        return list(itertools.islice(self.search_result(lang=lang, **criteria), n))
+
+    def search_result(
+        self, *, lang: models.Lang = models.Lang.EN, **criteria: list[str]
+    ) -> SearchResult:
+        """Search cards, as `CardDict.search_result`, among the view cards."""
+        ordinals = self.library.search_index.match(
+            {models.SearchDimension(k): v for k, v in criteria.items()}, lang=lang
+        )
+        return SearchResult(self.library.table, ordinals & self.ordinals)
 
 
 def get_dimension_values(
-    card: models.Card, dimension: models.SearchDimension
-) -> dict[models.Lang, list[str]] | list[str]:
+    card: models.Card,
+    dimension: models.SearchDimension,
+    features: models.CardFeatures | None = None,
+) -> DimensionValues:
     """Get the values of a dimension for a card.
 
     Trie dimensions (name, card/flavor text) return a per-language dict;
     set dimensions return a flat list.
+
+    Pass the card `features` when at hand, they are derived from its text otherwise.
     """
     match dimension:
         case models.SearchDimension.NAME:
@@ -352,7 +1803,7 @@ def get_dimension_values(
                 return [card.group.value]
             return []
         case models.SearchDimension.SECT:
-            return [s.value for s in _get_sects(card)]
+            return [s.value for s in (features or card_features(card)).sects]
         case models.SearchDimension.PATH:
             if isinstance(card, models.LibraryCard):
                 return card.path_requirement
@@ -360,18 +1811,25 @@ def get_dimension_values(
                 return [card.path]
             return []
         case models.SearchDimension.BONUS:
-            return [b.value for b in _get_bonus(card)]
+            return [b.value for b in (features or card_features(card)).bonuses]
         case models.SearchDimension.TITLE:
-            return [t.value for t in _get_titles(card)]
+            return [t.value for t in (features or card_features(card)).titles]
         case models.SearchDimension.CITY:
-            city = _get_city(card)
+            city = (features or card_features(card)).city
             return [city] if city else []
         case models.SearchDimension.TRAIT:
-            return [t.value for t in _get_traits(card)]
+            return [t.value for t in (features or card_features(card)).traits]
         case models.SearchDimension.ARTIST:
             return [a for a in card.artists]
         case models.SearchDimension.SET:
             return [p.set.code for p in card.prints]
+        case models.SearchDimension.FORMAT:
+            # every card is played in Standard, the VEKN "Format" adds others
+            return list(
+                dict.fromkeys(
+                    [models.Format.STANDARD.value, *(f.value for f in card.formats)]
+                )
+            )
         case models.SearchDimension.RARITY:
             return [
                 o.frequency.value
@@ -390,6 +1848,120 @@ def get_dimension_values(
             if isinstance(card, models.CryptCard) and card.capacity:
                 return [str(card.capacity)]
             return []
+        case _:
+            # range dimensions: see `get_range_value`
+            return []
+
+
+#: range dimension -> cost type
+_RANGE_COSTS = {
+    models.SearchDimension.POOL_COST: models.Cost.Type.POOL,
+    models.SearchDimension.BLOOD_COST: models.Cost.Type.BLOOD,
+    models.SearchDimension.CONVICTION_COST: models.Cost.Type.CONVICTION,
+}
+_DATE_DIMENSIONS = [models.SearchDimension.LEGAL, models.SearchDimension.BANNED]
+#: a comparison (">=8") or an inclusive range ("8..11", open ended "..11")
+RE_RANGE = re.compile(
+    r"^\s*(?:(?P<op><=|>=|<|>|=)\s*(?P<value>.+?)"
+    r"|(?P<low>[^.]*?)\s*\.\.\s*(?P<high>[^.]*?))\s*$"
+)
+
+
+def get_requirement(
+    card: models.LibraryCard, features: models.CardFeatures | None = None
+) -> Requirement:
+    """The requirement of a library card: clans, paths, disciplines and titles.
+
+    Args:
+        card: The library card.
+        features: The features of the card, computed if not given.
+    """
+    discipline = card.discipline_requirement
+    return Requirement(
+        clans=frozenset(card.clan_requirement),
+        paths=frozenset(card.path_requirement),
+        disciplines=frozenset(discipline.disciplines if discipline else []),
+        combo=bool(
+            discipline and discipline.type == models.DisciplineRequirement.Type.COMBO
+        ),
+        titles=frozenset(t.value for t in (features or card_features(card)).titles),
+    )
+
+
+def get_range_value(
+    card: models.Card, dimension: models.SearchDimension
+) -> int | datetime.date | None:
+    """Get the key of a card in a range dimension, None if it has none.
+
+    An "X" cost has no key.
+    """
+    if dimension == models.SearchDimension.CAPACITY:
+        return card.capacity if isinstance(card, models.CryptCard) else None
+    if dimension in _RANGE_COSTS:
+        if not isinstance(card, models.LibraryCard) or card.cost is None:
+            return None
+        if card.cost.type != _RANGE_COSTS[dimension]:
+            return None
+        return card.cost.value if isinstance(card.cost.value, int) else None
+    if dimension == models.SearchDimension.LEGAL:
+        return card.legal
+    if dimension == models.SearchDimension.BANNED:
+        return card.banned
+    return None
+
+
+def is_range(value: str | None) -> bool:
+    """Check if a search value is a range (with an operator, or "..")."""
+    return bool(value) and RE_RANGE.match(value) is not None
+
+
+def parse_range(
+    dimension: models.SearchDimension, value: str
+) -> tuple[int | datetime.date | None, int | datetime.date | None, bool, bool]:
+    """Parse a range search value: its bounds and whether they are inclusive.
+
+    Dates are ISO formatted, or a year for the first day of that year.
+
+    Raises:
+        ValueError: If the value is not a valid range for the dimension.
+
+    Returns:
+        The low and high bounds (None when open), and their inclusiveness.
+    """
+
+    def key(text: str) -> int | datetime.date | None:
+        text = text.strip()
+        if not text:
+            return None
+        try:
+            if dimension in _DATE_DIMENSIONS:
+                if text.isdigit():
+                    return datetime.date(int(text), 1, 1)
+                return datetime.date.fromisoformat(text)
+            return int(text)
+        except ValueError:
+            kind = "a date" if dimension in _DATE_DIMENSIONS else "a number"
+            raise ValueError(
+                f"invalid {dimension.value} value {value!r}: {text!r} is not {kind}"
+            ) from None
+
+    parsed = RE_RANGE.match(str(value))
+    if not parsed:
+        bound = key(str(value))
+        return bound, bound, True, True
+    if parsed.group("op"):
+        bound = key(parsed.group("value"))
+        match parsed.group("op"):
+            case "<":
+                return None, bound, True, False
+            case "<=":
+                return None, bound, True, True
+            case ">":
+                return bound, None, False, True
+            case ">=":
+                return bound, None, True, True
+        return bound, bound, True, True
+    return key(parsed.group("low")), key(parsed.group("high")), True, True
 
 
 TITLES_RE = r"({})".format("|".join(t.value.lower() for t in models.Title))
@@ -425,137 +1997,140 @@ LIBRARY_TITLES_RE = "({})".format(
 )
 
 
-def _get_sects(card: models.Card) -> list[models.Sect]:
-    """Index sect information for a card."""
-    ret = set[models.Sect]()
+TRAITS_RE = f"({'|'.join(t.value.lower() for t in models.Trait)})"
+
+# compiled once, matched once per card by `card_features`
+_RE_CRYPT_SECT = re.compile(
+    r"^(?:\[MERGED\] )?(Sabbat|Camarilla|Laibon|Anarch|Independent)"
+)
+_RE_LIBRARY_SECT = re.compile(
+    r"Requires a(?: ready)?(?: titled)? ([sS]abbat|[cC]amarilla|[lL]aibon)"
+)
+_RE_LIBRARY_ANARCH = re.compile(
+    r"Requires a(?: ready|n)(?: [iI]ndependent or)?(?: titled)? [aA]narch"
+)
+_RE_LIBRARY_INDEPENDENT = re.compile(r"Requires a(?: ready|n) [iI]ndependent")
+_RE_LIBRARY_TITLES = re.compile(LIBRARY_TITLES_RE)
+_RE_REQUIRES = re.compile(r"requires a ([^.]*)")
+_RE_REQUIRES_TITLED = re.compile(
+    r"Requires a(?: ready)? (?:titled (?:(?P<sect>[sS]abbat|[cC]amarilla)"
+    r"|(?P<any>vampire))|(?P<magaji>[mM]agaji))"
+)
+_RE_CRYPT_TITLES = re.compile(CRYPT_TITLES_RE)
+_RE_PLUS = re.compile(
+    r"\+(?:\d|X)\s+(?:([iI]ntercept)|([sS]tealth) (?!Ⓓ|action|political)"
+    r"|([cC]apacity)|([sS]trength)|([bB]leed)|([hH]unt))"
+)
+_RE_MINUS = re.compile(r"-(?:\d|X)\s+(?:([sS]tealth)|[iI]ntercept)")
+_RE_TO_ZERO = re.compile(r"(?:([sS]tealth)|[iI]ntercept)\s+to\s+(?:0|zero)")
+_RE_STEALTH_RESET = re.compile(r"stealth .* to 0")
+_RE_VOTES = re.compile(r"(?:\+|-)(?:\d|X) votes?")
+_RE_TITLE_OF = re.compile(r"title of " + TITLES_RE)
+_RE_TORPOR = re.compile(r"rescu|leaves? torpor")
+_RE_CITY = re.compile(CITY_RE)
+_RE_TRAITS = re.compile(TRAITS_RE)
+_PLUS_BONUSES = [
+    models.Bonus.INTERCEPT,
+    models.Bonus.STEALTH,
+    models.Bonus.CAPACITY,
+    models.Bonus.STRENGTH,
+    models.Bonus.BLEED,
+    models.Bonus.HUNT,
+]
+#: a stealth/intercept malus counts as a bonus of the other, except on these
+_NO_MALUS_BONUS_TYPES = {
+    models.Card.Type.MASTER,
+    models.Card.Type.VAMPIRE,
+    models.Card.Type.IMBUED,
+}
+
+
+def card_features(card: models.Card) -> models.CardFeatures:
+    """Derive the sects, bonuses, titles, city and traits of a card from its text.
+
+    Each pattern is compiled once, and the text lowercased once: prefer the
+    features cached by the search index (`CardDict.features`) to calling this.
+    """
+    text = card.text
+    lower = text.lower()
+    requires = "Requires a" in text
+    sects = set[models.Sect]()
+    bonuses = set[models.Bonus]()
+    titles = set[models.Title]()
+    traits = set[models.Trait]()
+    # sects
     if card.kind == models.Card.Kind.CRYPT:
-        if re.search(r"^(\[MERGED\] )?Sabbat", card.text):
-            ret.add(models.Sect.SABBAT)
-        if re.search(r"^(\[MERGED\] )?Camarilla", card.text):
-            ret.add(models.Sect.CAMARILLA)
-        if re.search(r"^(\[MERGED\] )?Laibon", card.text):
-            ret.add(models.Sect.LAIBON)
-        if re.search(r"^(\[MERGED\] )?Anarch", card.text):
-            ret.add(models.Sect.ANARCH)
-        if re.search(r"^(\[MERGED\] )?Independent", card.text):
-            ret.add(models.Sect.INDEPENDENT)
+        if match := _RE_CRYPT_SECT.match(text):
+            sects.add(models.Sect(match.group(1)))
     else:
-        if re.search(r"Requires a( ready)?( titled)? (S|s)abbat", card.text):
-            ret.add(models.Sect.SABBAT)
-        if re.search(r"Requires a( ready)?( titled)? (C|c)amarilla", card.text):
-            ret.add(models.Sect.CAMARILLA)
-        if re.search(r"Requires a( ready)?( titled)? (L|l)aibon", card.text):
-            ret.add(models.Sect.LAIBON)
-        if re.search(
-            r"Requires a( ready|n)( (I|i)ndependent or)?( titled)? (A|a)narch",
-            card.text,
-        ):
-            ret.add(models.Sect.ANARCH)
-        if re.search(r"Requires a( ready|n) (I|i)ndependent", card.text):
-            ret.add(models.Sect.INDEPENDENT)
-        match = re.search(LIBRARY_TITLES_RE, card.text.lower())
-        if match:
-            ret.add(TITLES_SECT[models.Title(match.group(1).title())])
-    return sorted(ret)
-
-
-def _get_bonus(card: models.Card) -> list[models.Bonus]:
-    """Bonuses a card provides."""
-    ret = set[models.Bonus]()
-    if re.search(r"\+(\d|X)\s+(i|I)ntercept", card.text):
-        ret.add(models.Bonus.INTERCEPT)
-    # do not include stealthed actions as stealth cards
-    if re.search(r"\+(\d|X)\s+(s|S)tealth (?!Ⓓ|action|political)", card.text):
-        ret.add(models.Bonus.STEALTH)
-    # stealth/intercept maluses count as bonus of the other
-    if not set(card.types) & {"Master", "Vampire", "Imbued"}:
-        if re.search(r"-(\d|X)\s+(s|S)tealth", card.text):
-            ret.add(models.Bonus.INTERCEPT)
-        if re.search(r"(s|S)tealth\s+to\s+(0|zero)", card.text):
-            ret.add(models.Bonus.INTERCEPT)
-        if re.search(r"-(\d|X)\s+(i|I)ntercept", card.text):
-            ret.add(models.Bonus.STEALTH)
-        if re.search(r"(i|I)ntercept\s+to\s+(0|zero)", card.text):
-            ret.add(models.Bonus.STEALTH)
+        if requires:
+            for match in _RE_LIBRARY_SECT.finditer(text):
+                sects.add(models.Sect(match.group(1).title()))
+            if _RE_LIBRARY_ANARCH.search(text):
+                sects.add(models.Sect.ANARCH)
+            if _RE_LIBRARY_INDEPENDENT.search(text):
+                sects.add(models.Sect.INDEPENDENT)
+        if match := _RE_LIBRARY_TITLES.search(lower):
+            sects.add(TITLES_SECT[models.Title(match.group(1).title())])
+    # bonuses
+    for match in _RE_PLUS.finditer(text):
+        bonuses.add(_PLUS_BONUSES[(match.lastindex or 1) - 1])
+    if not set(card.types) & _NO_MALUS_BONUS_TYPES:
+        for regex in (_RE_MINUS, _RE_TO_ZERO):
+            for match in regex.finditer(text):
+                bonuses.add(
+                    models.Bonus.INTERCEPT if match.group(1) else models.Bonus.STEALTH
+                )
     # list reset stealth as intercept
-    if re.search(r"stealth .* to 0", card.text):
-        ret.add(models.Bonus.INTERCEPT)
+    if _RE_STEALTH_RESET.search(text):
+        bonuses.add(models.Bonus.INTERCEPT)
     # list block denials as stealth
-    if re.search(r"attempt fails", card.text):
-        ret.add(models.Bonus.STEALTH)
-    elif re.search(r"(\+|-)(\d|X) votes?", card.text):
-        ret.add(models.Bonus.VOTES)
-    elif re.search(r"abstain", card.text):
-        ret.add(models.Bonus.VOTES)
-    if re.search(r"title of " + TITLES_RE, card.text.lower()):
-        ret.add(models.Bonus.VOTES)
-    elif card.id in {100406}:
-        ret.add(models.Bonus.VOTES)
-    if re.search(r"rescu", card.text.lower()):
-        ret.add(models.Bonus.TORPOR)
-    if re.search(r"leaves? torpor", card.text.lower()):
-        ret.add(models.Bonus.TORPOR)
-    if re.search(r"\+(\d|X)\s+(c|C)apacity", card.text):
-        ret.add(models.Bonus.CAPACITY)
-    if re.search(r"\+(\d|X)\s+(s|S)trength", card.text):
-        ret.add(models.Bonus.STRENGTH)
-    if re.search(r"\+(\d|X)\s+(b|B)leed", card.text):
-        ret.add(models.Bonus.BLEED)
-    if re.search(r"\+(\d|X)\s+(h|H)unt", card.text):
-        ret.add(models.Bonus.HUNT)
+    if "attempt fails" in text:
+        bonuses.add(models.Bonus.STEALTH)
+    elif "abstain" in text or _RE_VOTES.search(text):
+        bonuses.add(models.Bonus.VOTES)
+    if _RE_TITLE_OF.search(lower) or card.id in {100406}:
+        bonuses.add(models.Bonus.VOTES)
+    if _RE_TORPOR.search(lower):
+        bonuses.add(models.Bonus.TORPOR)
     if isinstance(card, models.LibraryCard) and card.trifle:
-        ret.add(models.Bonus.TRIFLE)
-    return sorted(ret)
-
-
-def _get_titles(card: models.Card) -> list[models.Title]:
-    """Index titles information for a card."""
-    ret: set[models.Title] = set()
+        bonuses.add(models.Bonus.TRIFLE)
+    # titles
     if card.kind == models.Card.Kind.CRYPT:
-        for match in re.findall(CRYPT_TITLES_RE, card.text.lower()):
-            ret.add(models.Title(match[2].title()))
-    if card.kind == models.Card.Kind.LIBRARY:
-        # Find the section starting with "requires a" up to the next period
-        match = re.search(r"requires a ([^.]*)", card.text.lower())
-        if match:
-            title_section = match.group(1)
-            for title_match in re.findall(LIBRARY_TITLES_RE, title_section):
-                ret.add(models.Title(title_match.title()))
-        if re.search(r"Requires a( ready)? titled (S|s)abbat", card.text):
-            ret.update(SECT_TITLES[models.Sect.SABBAT])
-        if re.search(r"Requires a( ready)? titled (C|c)amarilla", card.text):
-            ret.update(SECT_TITLES[models.Sect.CAMARILLA])
-        if re.search(r"Requires a( ready)? titled vampire", card.text):
-            ret.update(models.Title)
-        if re.search(r"Requires a( ready)? (M|m)agaji", card.text):
-            ret.update(SECT_TITLES[models.Sect.LAIBON])
-    return sorted(ret)
-
-
-def _get_city(card: models.Card) -> str | None:
-    """Get the city of a card."""
+        for match in _RE_CRYPT_TITLES.findall(lower):
+            titles.add(models.Title(match[2].title()))
+    if card.kind == models.Card.Kind.LIBRARY and requires:
+        # the section starting with "requires a" up to the next period
+        if match := _RE_REQUIRES.search(lower):
+            for title in _RE_LIBRARY_TITLES.findall(match.group(1)):
+                titles.add(models.Title(title.title()))
+        for match in _RE_REQUIRES_TITLED.finditer(text):
+            if match["sect"]:
+                titles.update(SECT_TITLES[models.Sect(match["sect"].title())])
+            elif match["any"]:
+                titles.update(models.Title)
+            else:
+                titles.update(SECT_TITLES[models.Sect.LAIBON])
+    # city
     city = None
-    match = re.search(CITY_RE, card.text)
-    if match:
+    if match := _RE_CITY.search(text):
         city = match.group(1)
         if city[-6:] == " as a ":
             city = city[:-6]
         if city == "Washington":
             city = "Washington, D.C."
-    return city
-
-
-TRAITS_RE = f"({'|'.join(t.value.lower() for t in models.Trait)})"
-
-
-def _get_traits(card: models.Card) -> list[models.Trait]:
-    """Get the traits of a card."""
-    ret = set[models.Trait]()
-    for match in re.findall(TRAITS_RE, card.text.lower()):
-        ret.add(models.Trait(match.title()))
+    # traits
+    for trait in _RE_TRAITS.findall(lower):
+        traits.add(models.Trait(trait.title()))
     if isinstance(card, models.LibraryCard) and card.discipline_requirement:
         if card.discipline_requirement.type == models.DisciplineRequirement.Type.COMBO:
-            ret.add(models.Trait.COMBO)
+            traits.add(models.Trait.COMBO)
         if card.discipline_requirement.type == models.DisciplineRequirement.Type.CHOICE:
-            ret.add(models.Trait.CHOICE)
-    return sorted(ret)
+            traits.add(models.Trait.CHOICE)
+    return models.CardFeatures(
+        sects=sorted(sects),
+        bonuses=sorted(bonuses),
+        titles=sorted(titles),
+        city=city,
+        traits=sorted(traits),
+    )
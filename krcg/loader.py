@@ -6,9 +6,14 @@ name, run `search`/`complete`):
 - `load()`: fast default — a version-keyed pickle cache, else `load_local()`.
 - `load_local()`: build from the packaged VEKN CSVs and rulings (offline).
 - `load_online(session)`: fetch the pre-built JSON from KRCG static (async).
+
+`use_aliases(cards)` keeps the fuzzy name matches a library learns (misspellings)
+on disk, to resolve them with a single dict probe in later processes.
 """
 
 from typing import cast
+import atexit
+import hashlib
 import importlib.metadata
 import logging
 import os
@@ -22,12 +27,16 @@ from . import card_references
 from . import collections
 from . import models
 from . import rulings
+from . import utils
 from . import vekn_csv
 
 
 VERSION = importlib.metadata.version("krcg")
 PICKLE_FILE = os.path.join(tempfile.gettempdir(), f"krcg_cards_{VERSION}.pkl")
+ALIASES_FILE = os.path.join(tempfile.gettempdir(), "krcg_aliases.json")
 logger = logging.getLogger("krcg")
+# ids of the libraries flushed at exit (kept alive by atexit: ids are not reused)
+_FLUSHED_AT_EXIT: set[int] = set()
 
 
 def load_local(available: set[str] | None = None) -> collections.CardDict:
@@ -48,14 +57,63 @@ def load_local(available: set[str] | None = None) -> collections.CardDict:
     return cards
 
 
-def load() -> collections.CardDict:
-    """Load the cards library fast: a version-keyed pickle cache, else `load_local`."""
+def load(*, aliases: bool = False) -> collections.CardDict:
+    """Load the cards library fast: a version-keyed pickle cache, else `load_local`.
+
+    Set ``aliases`` to keep the learned aliases on disk, see `use_aliases`.
+    """
     try:
         with open(PICKLE_FILE, "rb") as f:
-            return cast(collections.CardDict, pickle.load(f))
+            cards = cast(collections.CardDict, pickle.load(f))
     except Exception:
         logger.warning("no usable cards cache, building from local data", exc_info=True)
-        return load_local()
+        cards = load_local()
+    if aliases:
+        use_aliases(cards)
+    return cards
+
+
+def use_aliases(
+    cards: collections.CardDict, path: str = ALIASES_FILE
+) -> utils.AliasStore:
+    """Keep the fuzzy name matches the library learns in an on-disk store.
+
+    The matches learned by former processes are loaded, the new ones written back
+    at exit (or by ``cards.flush()``). The store is keyed by a digest of the card
+    names the matches resolve to: the matches of other card data are dropped. The
+    TWDA fetch script seeds it with the misspellings of the decklists
+    (``--aliases``).
+
+    Args:
+        cards: The cards library.
+        path: The store file (defaults to a shared file in the temp directory).
+
+    Returns:
+        The store.
+    """
+    store = utils.AliasStore(path, _names_digest(cards))
+    count = cards.attach(store)
+    logger.debug("%s learned aliases loaded from %s", count, path)
+    if id(cards) not in _FLUSHED_AT_EXIT:
+        _FLUSHED_AT_EXIT.add(id(cards))
+        atexit.register(_flush_at_exit, cards)
+    return store
+
+
+def _names_digest(cards: collections.CardDict) -> str:
+    """A digest of the card names and the card each one is, keying the aliases."""
+    names = sorted(
+        f"{name}\t{card.id}" for name, card in cards.items() if isinstance(name, str)
+    )
+    return hashlib.sha256("\n".join(names).encode()).hexdigest()
+
+
+def _flush_at_exit(cards: collections.CardDict) -> None:
+    """Write the aliases learned since the last write, without failing the exit."""
+    try:
+        cards.flush()
+    except OSError:
+        logger.warning("failed to write the learned aliases", exc_info=True)
 
 
 async def load_online(session: aiohttp.ClientSession) -> collections.CardDict:
@@ -68,14 +126,9 @@ async def load_online(session: aiohttp.ClientSession) -> collections.CardDict:
         cards = collections.CardDict()
         async with session.get("https://static.krcg.org/data/v5/vtes.json") as response:
             data = await response.json()
-        for card in data:
-            # dispatch on kind: a bare Card silently drops crypt/library fields
-            cls_ = (
-                models.CryptCard
-                if card["kind"] == models.Card.Kind.CRYPT
-                else models.LibraryCard
-            )
-            cards.add(msgspec.convert(card, type=cls_))
+        # crypt and library cards are a union tagged by their kind
+        for card in msgspec.convert(data, type=list[models.AnyCard]):
+            cards.add(card)
         async with session.get(
             "https://static.krcg.org/data/v5/expansions.json"
         ) as response:
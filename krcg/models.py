@@ -1,17 +1,23 @@
-"""Model definitions."""
+"""Model definitions.
+
+Models are `msgspec.Struct` types: no per-instance ``__dict__``, fast to decode
+and encode. They form trees (no reference cycles), so the garbage collector
+does not track them (``gc=False``). Crypt and library cards are a tagged union
+on ``kind``: decode a card as ``CryptCard | LibraryCard``.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field, fields
 import datetime
 from enum import StrEnum
-from typing import Literal
+from typing import ClassVar, Literal
+
+import msgspec
 
 FILING_PREFIXES = ["A", "An", "The", "El", "La", "Le", "Un", "Une", "Les", "Una"]
 
 
-@dataclass
-class NameVariant:
+class NameVariant(msgspec.Struct, gc=False):
     """A variant of a card name."""
 
     class Type(StrEnum):
@@ -26,8 +32,7 @@ class NameVariant:
     name: str
 
 
-@dataclass(kw_only=True)
-class Occurrence:
+class Occurrence(msgspec.Struct, kw_only=True, gc=False):
     """How a card appears in a print.
 
     A single flat type discriminated by `type` (so it round-trips through
@@ -57,16 +62,14 @@ class Occurrence:
     date: datetime.date | None = None  # SINGLE
 
 
-@dataclass(kw_only=True)
-class SetMinimal:
+class SetMinimal(msgspec.Struct, kw_only=True, gc=False):
     """A minimal set."""
 
     id: int = 0
     code: str
 
 
-@dataclass(kw_only=True)
-class Bundle:
+class Bundle(msgspec.Struct, kw_only=True, gc=False):
     """A product within a set (e.g. a preconstructed deck)."""
 
     code: str
@@ -75,22 +78,20 @@ class Bundle:
     release_date: datetime.date | None = None
 
 
-@dataclass(kw_only=True)
-class Set(SetMinimal):
+class Set(SetMinimal, kw_only=True):
     """A VTES expansion."""
 
     name: str
     company: str = ""
     release_date: datetime.date | None = None
-    bundles: dict[str, Bundle] = field(default_factory=dict)
+    bundles: dict[str, Bundle] = msgspec.field(default_factory=dict)
 
 
-@dataclass(kw_only=True)
-class Print:
+class Print(msgspec.Struct, kw_only=True, gc=False):
     """A specific print of a card."""
 
     set: SetMinimal
-    occurrences: list[Occurrence] = field(default_factory=list)
+    occurrences: list[Occurrence] = msgspec.field(default_factory=list)
     url: str
 
 
@@ -102,8 +103,7 @@ class Lang(StrEnum):
     ES = "es"
 
 
-@dataclass(kw_only=True)
-class Translation:
+class Translation(msgspec.Struct, kw_only=True, gc=False):
     """A translation of a card."""
 
     name: str
@@ -112,11 +112,10 @@ class Translation:
     draft: str = ""
     url: str = ""
     #: cards named in `text`, which marks each one `<Card Name>`
-    cards: list[CardMinimal] = field(default_factory=list)
+    cards: list[CardMinimal] = msgspec.field(default_factory=list)
 
 
-@dataclass
-class Variant:
+class Variant(msgspec.Struct, gc=False):
     """A link to a related form of the card (advanced, base, evolution)."""
 
     class Type(StrEnum):
@@ -132,8 +131,7 @@ class Variant:
     suffix: str
 
 
-@dataclass(kw_only=True, eq=False)
-class CardMinimal:
+class CardMinimal(msgspec.Struct, kw_only=True, eq=False, gc=False):
     """A card reduced to its id and names (shared by Card and CardInDeck)."""
 
     id: int
@@ -186,23 +184,20 @@ class CardMinimal:
     @classmethod
     def from_card(cls, card: CardMinimal) -> CardMinimal:
         """Project a fuller card down to a minimal one, dropping extra fields."""
-        return cls(**{f.name: getattr(card, f.name) for f in fields(cls)})
+        return cls(**{name: getattr(card, name) for name in cls.__struct_fields__})
 
 
-@dataclass(kw_only=True)
-class Ruling:
+class Ruling(msgspec.Struct, kw_only=True, gc=False):
     """A ruling on a card."""
 
-    @dataclass(kw_only=True)
-    class Reference:
+    class Reference(msgspec.Struct, kw_only=True, gc=False):
         """A reference to a ruling."""
 
         text: str
         label: str
         url: str
 
-    @dataclass(kw_only=True)
-    class Symbol:
+    class Symbol(msgspec.Struct, kw_only=True, gc=False):
         """A symbol referenced in a ruling."""
 
         text: str
@@ -211,9 +206,9 @@ class Ruling:
     text: str
     group: str = ""
     reminder: bool = False
-    references: list[Reference] = field(default_factory=list)
-    cards: list[CardMinimal] = field(default_factory=list)
-    symbols: list[Symbol] = field(default_factory=list)
+    references: list[Reference] = msgspec.field(default_factory=list)
+    cards: list[CardMinimal] = msgspec.field(default_factory=list)
+    symbols: list[Symbol] = msgspec.field(default_factory=list)
 
 
 class Group(StrEnum):
@@ -237,8 +232,7 @@ class Format(StrEnum):
     LIMITED = "Limited"
 
 
-@dataclass
-class DisciplineRequirement:
+class DisciplineRequirement(msgspec.Struct, gc=False):
     """A discipline requirement."""
 
     class Type(StrEnum):
@@ -250,7 +244,7 @@ class DisciplineRequirement:
 
     type: Type
     # library requirements are level-agnostic: lowercase trigrams (e.g. "dom")
-    disciplines: list[str] = field(default_factory=list)
+    disciplines: list[str] = msgspec.field(default_factory=list)
 
 
 class Title(StrEnum):
@@ -273,8 +267,7 @@ class Title(StrEnum):
     VOTE_2 = "2 Votes"
 
 
-@dataclass
-class Cost:
+class Cost(msgspec.Struct, gc=False):
     """A card cost in pool, blood, or conviction (value may be "X")."""
 
     class Type(StrEnum):
@@ -288,9 +281,8 @@ class Cost:
     value: int | Literal["X"]
 
 
-@dataclass(kw_only=True, eq=False, repr=False)
-class Card(CardMinimal):
-    """A VTES card."""
+class Card(CardMinimal, kw_only=True, tag_field="kind"):
+    """A VTES card: a `CryptCard` or a `LibraryCard`, as its `kind` tells."""
 
     class Kind(StrEnum):
         """The kind of card."""
@@ -316,18 +308,18 @@ class Card(CardMinimal):
         CONVICTION = "Conviction"
         IMBUED = "Imbued"
 
-    kind: Kind
-    name_variants: list[NameVariant] = field(default_factory=list)
-    prints: list[Print] = field(default_factory=list)
-    i18n: dict[Lang, Translation] = field(default_factory=dict)
+    kind: ClassVar[Card.Kind]
+    name_variants: list[NameVariant] = msgspec.field(default_factory=list)
+    prints: list[Print] = msgspec.field(default_factory=list)
+    i18n: dict[Lang, Translation] = msgspec.field(default_factory=dict)
     url: str = ""
-    types: list[Type] = field(default_factory=list)
-    formats: list[Format] = field(default_factory=list)
-    artists: list[str] = field(default_factory=list)
-    variants: list[Variant] = field(default_factory=list)
-    rulings: list[Ruling] = field(default_factory=list)
+    types: list[Type] = msgspec.field(default_factory=list)
+    formats: list[Format] = msgspec.field(default_factory=list)
+    artists: list[str] = msgspec.field(default_factory=list)
+    variants: list[Variant] = msgspec.field(default_factory=list)
+    rulings: list[Ruling] = msgspec.field(default_factory=list)
     #: cards named in `text`, which marks each one `<Card Name>`
-    cards: list[CardMinimal] = field(default_factory=list)
+    cards: list[CardMinimal] = msgspec.field(default_factory=list)
     text: str = ""
     draft: str = ""
     flavor: str = ""
@@ -344,42 +336,43 @@ class Card(CardMinimal):
             ]
 
 
-@dataclass(kw_only=True, eq=False, repr=False)
-class CryptCard(Card):
+class CryptCard(Card, kw_only=True, tag=Card.Kind.CRYPT.value):
     """A VTES crypt card."""
 
-    kind: Card.Kind = Card.Kind.CRYPT
+    kind: ClassVar[Card.Kind] = Card.Kind.CRYPT
     clan: str = ""
     path: str = ""
     advanced: bool = False
     capacity: int | None = None
     group: Group | None = None
     # crypt disciplines encode level by case: lower=inferior, UPPER=superior
-    disciplines: list[str] = field(default_factory=list)
+    disciplines: list[str] = msgspec.field(default_factory=list)
     title: Title | None = None
 
 
-@dataclass(kw_only=True, eq=False, repr=False)
-class LibraryCard(Card):
+class LibraryCard(Card, kw_only=True, tag=Card.Kind.LIBRARY.value):
     """A VTES library card."""
 
-    kind: Card.Kind = Card.Kind.LIBRARY
+    kind: ClassVar[Card.Kind] = Card.Kind.LIBRARY
     cost: Cost | None = None
     burn_option: bool = False
     trifle: bool = False
-    clan_requirement: list[str] = field(default_factory=list)
-    path_requirement: list[str] = field(default_factory=list)
+    clan_requirement: list[str] = msgspec.field(default_factory=list)
+    path_requirement: list[str] = msgspec.field(default_factory=list)
     discipline_requirement: DisciplineRequirement | None = None
 
 
-@dataclass(kw_only=True, eq=False)
-class CardInDeck(CardMinimal):
+#: a card of either kind, decoded by its ``kind`` tag
+type AnyCard = CryptCard | LibraryCard
+
+
+class CardInDeck(CardMinimal, kw_only=True):
     """A card in a deck."""
 
     count: int
     kind: Card.Kind
     types: list[Card.Type]
-    comment: str = field(default="")
+    comment: str = ""
 
     def __repr__(self) -> str:
         """Concise repr including the count."""
@@ -412,8 +405,7 @@ class Continent(StrEnum):
     ANTARCTICA = "AN"
 
 
-@dataclass(kw_only=True)
-class Country:
+class Country(msgspec.Struct, kw_only=True, gc=False):
     """A country."""
 
     name: str = ""
@@ -422,8 +414,7 @@ class Country:
     continent: Continent
 
 
-@dataclass(kw_only=True)
-class Event:
+class Event(msgspec.Struct, kw_only=True, gc=False):
     """A tournament."""
 
     name: str = ""
@@ -439,8 +430,7 @@ class Event:
     url: str = ""
 
 
-@dataclass(kw_only=True)
-class Score:
+class Score(msgspec.Struct, kw_only=True, gc=False):
     """A deck's tournament result (game wins and victory points)."""
 
     round_gw: int = 0
@@ -464,13 +454,12 @@ class Score:
         return ret
 
 
-@dataclass(kw_only=True)
-class Deck:
+class Deck(msgspec.Struct, kw_only=True, gc=False):
     """A decklist with its tournament metadata."""
 
     id: str = ""
     name: str = ""
-    cards: list[CardInDeck] = field(default_factory=list)
+    cards: list[CardInDeck] = msgspec.field(default_factory=list)
     comment: str = ""
     author: str = ""
     event: Event | None = None
@@ -519,6 +508,16 @@ class Sect(StrEnum):
     SABBAT = "Sabbat"
 
 
+class CardFeatures(msgspec.Struct, kw_only=True, gc=False):
+    """Attributes derived from a card text, as indexed for search."""
+
+    sects: list[Sect] = msgspec.field(default_factory=list)
+    bonuses: list[Bonus] = msgspec.field(default_factory=list)
+    titles: list[Title] = msgspec.field(default_factory=list)
+    city: str | None = None
+    traits: list[Trait] = msgspec.field(default_factory=list)
+
+
 class SearchDimension(StrEnum):
     """A card search dimension (a keyword key accepted by CardDict.search)."""
 
@@ -539,5 +538,11 @@ class SearchDimension(StrEnum):
     RARITY = "rarity"
     SECT = "sect"
     SET = "set"
+    FORMAT = "format"
     TITLE = "title"
     TRAIT = "trait"
+    POOL_COST = "pool_cost"
+    BLOOD_COST = "blood_cost"
+    CONVICTION_COST = "conviction_cost"
+    LEGAL = "legal"
+    BANNED = "banned"
@@ -748,10 +748,11 @@ class Parser:
 
     def get_card(self, line: str) -> models.CardInDeck | None:
         """Try to find a card and count; register possible comment."""
-        if re.match(_HEADERS_RE, utils.normalize(line)):
+        normalized = utils.normalize(line)
+        if re.match(_HEADERS_RE, normalized):
             return None
         card, name, count, comment, mark = None, None, 0, "", None
-        match = re.match(_RE, utils.normalize(line))
+        match = re.match(_RE, normalized)
         # count before a card name is most common and easier to parse
         if match:
             name = match.group("name")
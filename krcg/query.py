@@ -0,0 +1,325 @@
+"""A boolean query language over the card search index.
+
+A query combines search terms with AND, OR, NOT and parentheses, e.g.
+``clan:Brujah (discipline:pot OR discipline:cel) NOT discipline:pre capacity>=8``.
+
+- A term is ``dimension:value``, a dimension of `CardDict.search` and a value as
+  `search` takes it: ``clan:"Banu Haqim"``, ``card_text:"does not unlock"``
+  (a quoted phrase), ``capacity:8..11``. A bare value searches the card name.
+- Range dimensions also take a comparison: ``pool_cost<=2``, ``legal>=2020``.
+- Values of the other dimensions (clan, type, discipline...) are case insensitive
+  when that is not ambiguous: ``clan:brujah`` is ``clan:Brujah``, but ``pot`` and
+  ``POT`` are distinct disciplines. An unknown value is an error.
+- Terms next to each other are ANDed. NOT (or ``-term``) binds tighter than AND,
+  AND tighter than OR. Keywords are case insensitive.
+
+`parse` compiles a query into a plan (`Term`, `And`, `Or`, `Not` nodes), which
+`evaluate` runs over the index as sets of card ordinals, in a single pass.
+`search` does both:
+
+>>> query.search(cards, "clan:Brujah (discipline:POT OR discipline:CEL)").count()
+64
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+
+from . import collections
+from . import models
+
+
+class QueryError(ValueError):
+    """An invalid query: syntax error, unknown dimension, operator or value."""
+
+
+@dataclass(frozen=True)
+class Term:
+    """A search term: the cards matching a value in a dimension."""
+
+    dimension: models.SearchDimension
+    value: str
+
+
+@dataclass(frozen=True)
+class And:
+    """The cards matching all children."""
+
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    """The cards matching any child."""
+
+    children: tuple[Node, ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    """The cards not matching the child."""
+
+    child: Node
+
+
+type Node = Term | And | Or | Not
+
+_TEXT_DIMENSIONS = collections.CardSearch._TRIE_DIMENSIONS
+_RANGE_DIMENSIONS = collections.CardSearch._RANGE_DIMENSIONS
+_RANGE_ONLY_DIMENSIONS = collections.CardSearch._RANGE_ONLY_DIMENSIONS
+_KEYWORDS = {"AND", "OR", "NOT"}
+_COMPARISONS = {"<", "<=", ">", ">="}
+_RE_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<open>\()
+        |(?P<close>\))
+        |(?P<negate>-)(?=[^\s)])
+        |(?:(?P<dimension>[a-zA-Z_]+)(?P<op><=|>=|:|=|<|>))?
+         (?P<value>"[^"]*"|[^\s()"]+)
+    )""",
+    re.VERBOSE,
+)
+_RE_MISSING_VALUE = re.compile(r"[a-zA-Z_]+(?:<=|>=|:|=|<|>)")
+
+
+def _tokenize(text: str) -> list[re.Match[str]]:
+    """Split a query into tokens."""
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        token = _RE_TOKEN.match(text, position)
+        if not token or token.end() == position:
+            raise QueryError(f"invalid query at {position}: {text[position:]!r}")
+        tokens.append(token)
+        position = token.end()
+    return tokens
+
+
+def _keyword(token: re.Match[str] | None) -> str | None:
+    """The keyword a token is, if any."""
+    if token is None or token.group("dimension") or not token.group("value"):
+        return None
+    keyword = token.group("value").upper()
+    return keyword if keyword in _KEYWORDS else None
+
+
+def _term(token: re.Match[str]) -> Term:
+    """Build a term from a token."""
+    value = token.group("value")
+    if not token.group("dimension") and _RE_MISSING_VALUE.fullmatch(value):
+        raise QueryError(f"missing value: {value}")
+    if not token.group("dimension") and value == "-":
+        # a negation followed by nothing (or by a space), not a name
+        raise QueryError("missing term after '-'")
+    try:
+        dimension = models.SearchDimension(
+            (token.group("dimension") or models.SearchDimension.NAME).lower()
+        )
+    except ValueError:
+        raise QueryError(f"unknown dimension: {token.group('dimension')}") from None
+    op = token.group("op")
+    if op in _COMPARISONS:
+        if dimension not in _RANGE_DIMENSIONS:
+            raise QueryError(f"{dimension.value} does not take {op}")
+        value = op + value.strip('"')
+    elif dimension not in _TEXT_DIMENSIONS:
+        # quotes delimit a value, only text dimensions search phrases
+        value = value.strip('"')
+    return Term(dimension, value)
+
+
+class _Parser:
+    """A recursive descent parser of queries."""
+
+    def __init__(self, text: str) -> None:
+        """Constructor."""
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self) -> re.Match[str] | None:
+        """The current token."""
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def parse(self) -> Node:
+        """Parse the whole query."""
+        if not self.tokens:
+            return Or(())
+        node = self.parse_or()
+        if (token := self.peek()) is not None:
+            raise QueryError(f"unexpected {token.group().strip()!r}")
+        return node
+
+    def parse_or(self) -> Node:
+        """Parse ORed expressions."""
+        children = [self.parse_and()]
+        while _keyword(self.peek()) == "OR":
+            self.position += 1
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        """Parse ANDed expressions, the AND keyword being optional."""
+        children = [self.parse_not()]
+        while (token := self.peek()) is not None and not token.group("close"):
+            keyword = _keyword(token)
+            if keyword == "OR":
+                break
+            if keyword == "AND":
+                self.position += 1
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_not(self) -> Node:
+        """Parse a negated expression, or an atom."""
+        token = self.peek()
+        if token is not None and (token.group("negate") or _keyword(token) == "NOT"):
+            self.position += 1
+            return Not(self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self) -> Node:
+        """Parse a term or a parenthesized expression."""
+        token = self.peek()
+        if token is None:
+            raise QueryError("unexpected end of query")
+        self.position += 1
+        if token.group("open"):
+            node = self.parse_or()
+            closing = self.peek()
+            if closing is None or not closing.group("close"):
+                raise QueryError("missing closing parenthesis")
+            self.position += 1
+            return node
+        if token.group("close") or _keyword(token):
+            raise QueryError(f"unexpected {token.group().strip()!r}")
+        return _term(token)
+
+
+def parse(text: str) -> Node:
+    """Compile a query into an evaluation plan.
+
+    Raises:
+        QueryError: If the query is invalid.
+    """
+    return _Parser(text).parse()
+
+
+def evaluate(
+    node: Node, index: collections.CardSearch, lang: models.Lang = models.Lang.EN
+) -> set[int]:
+    """Run a plan over the search index.
+
+    Args:
+        node: The plan, as `parse` returns it.
+        index: The search index.
+        lang: The language to search text dimensions in.
+
+    Raises:
+        QueryError: If a term value is invalid for its dimension (e.g. not a number,
+            or not a value of the dimension).
+
+    Returns:
+        The ordinals of the matching cards.
+    """
+    match node:
+        case Term():
+            value = _value(node, index)
+            try:
+                return index.match({node.dimension: [value]}, lang=lang)
+            except ValueError as error:
+                # comparisons are written as such, other terms dimension:value
+                separator = "" if node.value.startswith(("<", ">")) else ":"
+                term = f"{node.dimension.value}{separator}{node.value}"
+                raise QueryError(f"invalid term {term}: {error}") from None
+        case Or():
+            ret = set[int]()
+            for child in node.children:
+                ret |= evaluate(child, index, lang)
+            return ret
+        case And():
+            # intersect the cheapest (non-text) terms first, negations last:
+            # a negation subtracts from the cards found, no complement needed
+            positive = sorted(
+                (c for c in node.children if not isinstance(c, Not)), key=_cost
+            )
+            negative = [c.child for c in node.children if isinstance(c, Not)]
+            if positive:
+                ret = evaluate(positive[0], index, lang)
+            else:
+                ret = _universe(index)
+            for child in positive[1:]:
+                if not ret:
+                    return ret
+                ret &= evaluate(child, index, lang)
+            for child in negative:
+                if not ret:
+                    return ret
+                ret -= evaluate(child, index, lang)
+            return ret
+        case Not():
+            return _universe(index) - evaluate(node.child, index, lang)
+
+
+def _value(term: Term, index: collections.CardSearch) -> str:
+    """The value of a term, as the index has it for a set dimension.
+
+    Raises:
+        QueryError: If the value is not one of the dimension, even case insensitive,
+            or matches several values case insensitive.
+    """
+    dimension, value = term.dimension, term.value
+    if (
+        dimension in _TEXT_DIMENSIONS
+        or dimension in _RANGE_ONLY_DIMENSIONS
+        or (dimension in _RANGE_DIMENSIONS and collections.is_range(value))
+    ):
+        return value
+    values: collections.SetIndex = getattr(index, dimension.value)
+    if value in values:
+        return value
+    matches = [v for v in values if v is not None and v.lower() == value.lower()]
+    if len(matches) == 1:
+        return matches[0]
+    if matches:
+        raise QueryError(
+            f"ambiguous {dimension.value}: {value} ({' or '.join(sorted(matches))})"
+        )
+    raise QueryError(f"unknown {dimension.value}: {value}")
+
+
+def _cost(node: Node) -> int:
+    """A rough cost of evaluating a node: text searches cost more."""
+    match node:
+        case Term():
+            return 1 if node.dimension in _TEXT_DIMENSIONS else 0
+        case _:
+            return 2
+
+
+def _universe(index: collections.CardSearch) -> set[int]:
+    """The ordinals of all cards."""
+    return index.match({})
+
+
+def search(
+    cards: collections.CardDict, text: str, lang: models.Lang = models.Lang.EN
+) -> collections.SearchResult:
+    """Search cards with a query.
+
+    Args:
+        cards: The (indexed) cards library.
+        text: The query.
+        lang: The language to search text dimensions in (defaults to English).
+
+    Raises:
+        QueryError: If the query is invalid.
+
+    Returns:
+        The matching cards, sorted by name.
+    """
+    return collections.SearchResult(
+        cards.table, evaluate(parse(text), cards.search_index, lang)
+    )
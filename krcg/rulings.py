@@ -206,20 +206,26 @@ def load_from_files(
     groups_file: typing.IO[str],
     references_file: typing.IO[str],
 ) -> None:
-    """Load rulings from files."""
+    """Load rulings from files, into the cards.
+
+    Each card gets its rulings, a group ruling being copied to every card of the
+    group. `CardDict.index` indexes them in `cards.rulings`, each ruling once: the
+    rulings of an indexed library are indexed again (`CardDict.index_rulings`).
+    """
     all_rulings = yaml.safe_load(rulings_file)
     groups = yaml.safe_load(groups_file)
     references = yaml.safe_load(references_file)
     for nid, rulings_list in all_rulings.items():
         id_, name = nid.split("|")
-        if id_.startswith("G"):
+        group = name if id_.startswith("G") else ""
+        if group:
             # group ruling: applies to each member card, prefixed with its symbol
             members = [
-                (cards[int(member.split("|")[0])], prefix, name)
+                (cards[int(member.split("|")[0])], prefix)
                 for member, prefix in groups[nid].items()
             ]
         else:
-            members = [(cards[int(id_)], "", "")]
+            members = [(cards[int(id_)], "")]
         for entry in rulings_list:
             # An entry is a plain string, or a {text, overrides} map giving
             # per-card wording for some member cards of a group ruling. A REMINDER
@@ -233,14 +239,22 @@ def load_from_files(
             else:
                 text, reminder = strip_reminder(entry)
                 overrides = {}
-            for card, prefix, group_name in members:
+            ruling = _parse_text(cards, text, references)
+            ruling.group = group
+            ruling.reminder = reminder
+            for card, prefix in members:
+                if card.id not in overrides and not prefix:
+                    # the same ruling object for every member with the same text
+                    card.rulings.append(ruling)
+                    continue
                 member_text = (
                     overrides[card.id] if card.id in overrides else prefix + text
                 )
-                ruling = _parse_text(cards, member_text, references)
-                ruling.group = group_name
-                ruling.reminder = reminder
-                card.rulings.append(ruling)
+                member_ruling = _parse_text(cards, member_text, references)
+                member_ruling.group = group
+                member_ruling.reminder = reminder
+                card.rulings.append(member_ruling)
+    cards.index_rulings()
 
 
 def _parse_text(
@@ -26,6 +26,11 @@ def main() -> None:
     cli_parser.add_argument(
         "--output", "-o", type=str, required=True, help="Output directory."
     )
+    cli_parser.add_argument(
+        "--aliases",
+        type=str,
+        help="Alias store to seed with the card name misspellings of the decklists.",
+    )
     args = cli_parser.parse_args()
     output = pathlib.Path(args.output)
     try:
@@ -34,8 +39,11 @@ def main() -> None:
         print(f"Cannot create file {output}: {sys.exc_info()[1]}", file=sys.stderr)
         return
     cards = loader.load_local()
+    if args.aliases:
+        loader.use_aliases(cards, args.aliases)
     parser.setup_parser_logging(True)
     fetch_twda(output, cards)
+    cards.flush()
 
 
 if __name__ == "__main__":
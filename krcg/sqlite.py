@@ -0,0 +1,406 @@
+"""Export the cards library to a SQLite file, searchable without KRCG.
+
+The file holds every card (as JSON, rulings and translations included), the
+values of every search dimension in normalized tables, and an FTS5 full-text
+index of the names, card texts and flavor texts in every language:
+
+- ``cards(id, kind, printed_name, full_name, json)``
+- ``names(name, lang, card_id)``: normalized names, for completion
+- ``dimensions(dimension, value, card_id)``: set dimensions, NULL for no value
+- ``ranges(dimension, value, card_id)``: numbers, and dates as ISO strings
+- ``translations(card_id, lang, name, text, flavor)``
+- ``rulings(card_id, text, "group")``
+- ``texts(card_id, lang, name, card_text, flavor_text)``: the FTS5 index, of
+  the words as `utils.Trie` splits and normalizes them
+- ``phrases(dimension, lang, text, card_id)``: the texts as `utils.NgramIndex`
+  normalizes them, for "quoted phrase" searches
+
+`export` writes it, `Database` answers `search` and `complete` from it, as the
+`CardDict` methods of the same name do (completions being ranked by name, not
+scored).
+"""
+
+from collections.abc import Iterator
+import datetime
+import pathlib
+import sqlite3
+import string
+
+import msgspec
+
+from . import collections
+from . import models
+from . import utils
+
+# the texts are split beforehand, as the Trie does: only whitespace separates words
+_TOKENCHARS = "".join(c for c in string.punctuation if c not in "'\"")
+_SCHEMA = f"""
+CREATE TABLE cards (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    printed_name TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    json TEXT NOT NULL
+);
+CREATE TABLE names (name TEXT NOT NULL, lang TEXT NOT NULL, card_id INTEGER);
+CREATE TABLE dimensions (dimension TEXT NOT NULL, value TEXT, card_id INTEGER);
+CREATE TABLE ranges (dimension TEXT NOT NULL, value NOT NULL, card_id INTEGER);
+CREATE TABLE translations (
+    card_id INTEGER, lang TEXT, name TEXT, text TEXT, flavor TEXT
+);
+CREATE TABLE rulings (card_id INTEGER, text TEXT, "group" TEXT);
+CREATE VIRTUAL TABLE texts USING fts5(
+    card_id UNINDEXED,
+    lang UNINDEXED,
+    name,
+    card_text,
+    flavor_text,
+    tokenize = "unicode61 remove_diacritics 0 tokenchars '{_TOKENCHARS}'"
+);
+CREATE TABLE phrases (
+    dimension TEXT NOT NULL, lang TEXT NOT NULL, text TEXT NOT NULL, card_id INTEGER
+);
+"""
+# created after the bulk inserts, faster than maintained during them
+_INDEXES = """
+CREATE INDEX names_name ON names (name, lang);
+CREATE INDEX dimensions_value ON dimensions (dimension, value);
+CREATE INDEX ranges_value ON ranges (dimension, value);
+CREATE INDEX translations_card ON translations (card_id);
+CREATE INDEX rulings_card ON rulings (card_id);
+CREATE INDEX phrases_dimension ON phrases (dimension, lang);
+"""
+
+_TRIE_DIMENSIONS = collections.CardSearch._TRIE_DIMENSIONS
+_RANGE_DIMENSIONS = collections.CardSearch._RANGE_DIMENSIONS
+_RANGE_ONLY_DIMENSIONS = collections.CardSearch._RANGE_ONLY_DIMENSIONS
+_INTERSECT_SET_DIMENSIONS = collections.CardSearch._INTERSECT_SET_DIMENSIONS
+
+
+def export(cards: collections.CardDict, path: str | pathlib.Path) -> None:
+    """Write the cards library to a SQLite file, replacing it if it exists.
+
+    Args:
+        cards: The cards library.
+        path: The file to write.
+    """
+    path = pathlib.Path(path)
+    path.unlink(missing_ok=True)
+    with sqlite3.connect(path) as connection:
+        connection.executescript(_SCHEMA)
+        connection.executemany(
+            "INSERT INTO cards VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    c.id,
+                    c.kind.value,
+                    c.printed_name,
+                    c.full_name,
+                    msgspec.json.encode(c).decode(),
+                )
+                for c in cards.cards()
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO names VALUES (?, ?, ?)", _names(cards.cards())
+        )
+        connection.executemany(
+            "INSERT INTO dimensions VALUES (?, ?, ?)", _dimensions(cards)
+        )
+        connection.executemany("INSERT INTO ranges VALUES (?, ?, ?)", _ranges(cards))
+        connection.executemany(
+            "INSERT INTO translations VALUES (?, ?, ?, ?, ?)",
+            (
+                (c.id, lang.value, t.name, t.text, t.flavor)
+                for c in cards.cards()
+                for lang, t in c.i18n.items()
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO rulings VALUES (?, ?, ?)",
+            ((c.id, r.text, r.group) for c in cards.cards() for r in c.rulings),
+        )
+        connection.executemany(
+            "INSERT INTO texts VALUES (?, ?, ?, ?, ?)", _texts(cards.cards())
+        )
+        connection.executemany(
+            "INSERT INTO phrases VALUES (?, ?, ?, ?)", _phrases(cards.cards())
+        )
+        connection.executescript(_INDEXES)
+    connection.close()
+
+
+def _names(cards: Iterator[models.Card]) -> Iterator[tuple[str, str, int]]:
+    """The normalized names of the cards, per language."""
+    for card in cards:
+        values = collections.get_dimension_values(card, models.SearchDimension.NAME)
+        assert isinstance(values, dict)
+        for lang, names in values.items():
+            for name in dict.fromkeys(utils.normalize(n) for n in names):
+                yield name, lang, card.id
+
+
+def _dimensions(
+    cards: collections.CardDict,
+) -> Iterator[tuple[str, str | None, int]]:
+    """The set dimension values of the cards."""
+    for card in cards.cards():
+        features = cards.features(card)
+        for dimension in models.SearchDimension:
+            if dimension in _TRIE_DIMENSIONS or dimension in _RANGE_ONLY_DIMENSIONS:
+                continue
+            values = collections.get_dimension_values(card, dimension, features)
+            assert isinstance(values, list)
+            for value in values or [None]:
+                yield dimension.value, value, card.id
+
+
+def _range_key(key: int | datetime.date | None) -> int | str | None:
+    """A range key as stored: dates as ISO strings, which sort as dates do."""
+    if isinstance(key, datetime.date):
+        return key.isoformat()
+    return key
+
+
+def _ranges(cards: collections.CardDict) -> Iterator[tuple[str, int | str, int]]:
+    """The range dimension values of the cards."""
+    for card in cards.cards():
+        for dimension in _RANGE_DIMENSIONS:
+            key = _range_key(collections.get_range_value(card, dimension))
+            if key is not None:
+                yield dimension.value, key, card.id
+
+
+def _texts(
+    cards: Iterator[models.Card],
+) -> Iterator[tuple[int, str, str, str, str]]:
+    """The text dimensions of the cards, a row per language."""
+    for card in cards:
+        values: list[dict[models.Lang, list[str]]] = []
+        for dimension in _TRIE_DIMENSIONS:
+            lang_values = collections.get_dimension_values(card, dimension)
+            assert isinstance(lang_values, dict)
+            values.append(lang_values)
+        for lang in dict.fromkeys(lang for v in values for lang in v):
+            name, text, flavor = (
+                "\n".join(" ".join(utils.Trie._split(t)) for t in v.get(lang, []))
+                for v in values
+            )
+            yield card.id, lang, name, text, flavor
+
+
+def _phrases(cards: Iterator[models.Card]) -> Iterator[tuple[str, str, str, int]]:
+    """The text dimensions of the cards, a row per value."""
+    for card in cards:
+        for dimension in _TRIE_DIMENSIONS:
+            lang_values = collections.get_dimension_values(card, dimension)
+            assert isinstance(lang_values, dict)
+            for lang, texts in lang_values.items():
+                for text in dict.fromkeys(map(utils.NgramIndex._prepare, texts)):
+                    if text:
+                        yield dimension.value, lang, text, card.id
+
+
+def _text_condition(
+    dimension: models.SearchDimension, text: str, langs: list[str]
+) -> tuple[str, list]:
+    """The SQL condition and parameters of a text search value, as `i18nTrie`.
+
+    Words are split and normalized as the Trie does, and each matches the start of
+    a word (a quoted FTS5 prefix: punctuation is matched, not interpreted). Quoted
+    phrases match anywhere in a single text, as the n-gram index does. Words must
+    all match in the same language, phrases in any of them.
+    """
+    placeholders = ", ".join("?" * len(langs))
+    conditions: list[str] = []
+    parameters: list = []
+    phrases = [p for p in collections.RE_PHRASE.findall(text) if p.strip()]
+    words = utils.Trie._split(collections.RE_PHRASE.sub(" ", text))
+    if words or not phrases:
+        if not words:
+            return "0", []
+        conditions.append(
+            "id IN (SELECT card_id FROM texts WHERE texts MATCH ? "
+            f"AND lang IN ({placeholders}))"
+        )
+        query = " AND ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+        parameters.extend([f"{dimension.value} : ({query})", *langs])
+    for phrase in phrases:
+        phrase = utils.NgramIndex._prepare(phrase)
+        if not phrase:
+            return "0", []
+        conditions.append(
+            "id IN (SELECT card_id FROM phrases WHERE dimension = ? "
+            f"AND lang IN ({placeholders}) AND instr(text, ?))"
+        )
+        parameters.extend([dimension.value, *langs, phrase])
+    return "(" + " AND ".join(conditions) + ")", parameters
+
+
+class Database:
+    """A cards library exported by `export`, searched with SQL."""
+
+    def __init__(self, path: str | pathlib.Path) -> None:
+        """Open the file (read only).
+
+        Args:
+            path: The file `export` wrote.
+        """
+        self.connection = sqlite3.connect(
+            f"{pathlib.Path(path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+
+    def close(self) -> None:
+        """Close the file."""
+        self.connection.close()
+
+    def __enter__(self) -> "Database":
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Context manager exit: close the file."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of cards."""
+        return self.connection.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def __getitem__(self, card_id: int) -> models.Card:
+        """Get a card by id."""
+        row = self.connection.execute(
+            "SELECT json FROM cards WHERE id = ?", (card_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(card_id)
+        return _decode(row[0])
+
+    def _cards(self, query: str, parameters: list) -> list[models.Card]:
+        """Run a query selecting cards JSON."""
+        return [_decode(row[0]) for row in self.connection.execute(query, parameters)]
+
+    def complete(self, text: str, lang: str = models.Lang.EN) -> list[models.Card]:
+        """Complete a card name: names starting with the text first, then by word.
+
+        The cards match as `CardDict.complete` ones do, but are not ranked the same
+        (so the top 10 may differ): `CardDict.complete` ranks them by their Trie
+        score (longest word prefixes, first word matches), this by name.
+
+        Args:
+            text: Part of the name.
+            lang: Preferred language code (defaults to English).
+
+        Returns:
+            Up to 10 matching cards, names starting with the text first, then the
+            names matching all words, each sorted by name.
+        """
+        text = utils.normalize(text)
+        words = utils.Trie._split(text)
+        if not words:
+            return []
+        langs = list(dict.fromkeys([models.Lang.EN.value, str(lang)]))
+        placeholders = ", ".join("?" * len(langs))
+        query = (
+            "SELECT json FROM cards WHERE id IN ("
+            "SELECT card_id FROM names WHERE name >= ? AND name < ? "
+            f"AND lang IN ({placeholders}) "
+            ") ORDER BY printed_name, id LIMIT 10"
+        )
+        ret = self._cards(query, [text, text + "\uffff", *langs])
+        if len(ret) < 10:
+            condition, parameters = _text_condition(
+                models.SearchDimension.NAME, " ".join(words), langs
+            )
+            query = (
+                f"SELECT json FROM cards WHERE {condition} "
+                "ORDER BY printed_name, id LIMIT 10"
+            )
+            ret.extend(c for c in self._cards(query, parameters) if c not in ret)
+        return ret[:10]
+
+    def search(
+        self,
+        *,
+        n: int | None = 100,
+        lang: models.Lang = models.Lang.EN,
+        **criteria: list[str],
+    ) -> list[models.Card]:
+        """Search cards across the available dimensions, as `CardDict.search`.
+
+        Args:
+            n: Maximum number of cards to return (defaults to 100).
+            lang: Language to search text dimensions in (defaults to English).
+            **criteria: Dimension filters, e.g. `clan=["Brujah"], sect=["Sabbat"]`.
+
+        Returns:
+            The matching cards, sorted by name (all cards without criteria).
+        """
+        conditions: list[str] = []
+        parameters: list = []
+        langs = list(dict.fromkeys([models.Lang.EN.value, str(lang)]))
+        for key, values in criteria.items():
+            dimension = models.SearchDimension(key)
+            if isinstance(values, str):
+                values = [values]
+            alternatives: list[str] = []
+            if dimension in _RANGE_ONLY_DIMENSIONS or (
+                dimension in _RANGE_DIMENSIONS
+                and any(map(collections.is_range, values))
+            ):
+                for value in values:
+                    low, high, low_inclusive, high_inclusive = collections.parse_range(
+                        dimension, value
+                    )
+                    condition = "SELECT card_id FROM ranges WHERE dimension = ?"
+                    parameters.append(dimension.value)
+                    if low is not None:
+                        condition += (
+                            " AND value >=" if low_inclusive else " AND value >"
+                        )
+                        condition += " ?"
+                        parameters.append(_range_key(low))
+                    if high is not None:
+                        condition += (
+                            " AND value <=" if high_inclusive else " AND value <"
+                        )
+                        condition += " ?"
+                        parameters.append(_range_key(high))
+                    alternatives.append(f"id IN ({condition})")
+            elif dimension in _TRIE_DIMENSIONS:
+                for value in values:
+                    if not value:
+                        continue
+                    condition, condition_parameters = _text_condition(
+                        dimension, value, langs
+                    )
+                    alternatives.append(condition)
+                    parameters.extend(condition_parameters)
+            else:
+                for value in values:
+                    if not value and value is not None:
+                        continue
+                    alternatives.append(
+                        "id IN (SELECT card_id FROM dimensions "
+                        "WHERE dimension = ? AND value IS ?)"
+                    )
+                    parameters.extend([dimension.value, value])
+            if not alternatives:
+                return []
+            # all values must match for those, any value for the others
+            operator = " AND " if dimension in _INTERSECT_SET_DIMENSIONS else " OR "
+            conditions.append("(" + operator.join(alternatives) + ")")
+        query = "SELECT json FROM cards"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY printed_name, id"
+        if n is not None:
+            query += " LIMIT ?"
+            parameters.append(n)
+        return self._cards(query, parameters)
+
+
+def _decode(data: str) -> models.Card:
+    """Decode a card from its JSON, of the type its kind tag names."""
+    return msgspec.json.decode(data, type=models.AnyCard)
@@ -1,7 +1,12 @@
 """Utilities."""
 
-from .fuzzy_dict import FuzzyDict
+from .aho_corasick import AhoCorasick, Mention
+from .fuzzy_dict import AliasStore, CacheInfo, FuzzyDict, Lookup, Match
+from .ngram import NgramIndex
+from .pickling import PicklableLocks
+from .range_index import RangeIndex
 from .string import normalize
+from .tfidf import TfIdf
 from .trie import Trie
 from .deck import sorted_library, sorted_crypt, vekn_name, add_card, sort_cards
 
@@ -10,8 +15,18 @@ __all__ = [
     "sorted_library",
     "sorted_crypt",
     "vekn_name",
+    "AhoCorasick",
+    "AliasStore",
+    "CacheInfo",
     "FuzzyDict",
+    "Lookup",
+    "Match",
+    "Mention",
+    "NgramIndex",
+    "PicklableLocks",
+    "RangeIndex",
     "normalize",
+    "TfIdf",
     "Trie",
     "add_card",
     "sort_cards",
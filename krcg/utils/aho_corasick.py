@@ -0,0 +1,132 @@
+"""An Aho-Corasick automaton, to find many names in a text in a single pass."""
+
+from collections.abc import Hashable, Iterable
+from typing import NamedTuple
+
+import unidecode
+
+
+class Mention[T](NamedTuple):
+    """A pattern found in a text: its span in the text, and the pattern reference."""
+
+    start: int
+    end: int
+    reference: T
+
+
+class AhoCorasick[H: Hashable]:
+    """A multi-pattern automaton: find all patterns in a text in one pass over it.
+
+    Patterns and texts are normalized (unidecode, lowercase), and a pattern only
+    matches whole words. Overlapping matches resolve to the leftmost, then the
+    longest: "Carrion Crows" over "Crow", not both.
+
+    Spans are given in the original text, whatever the normalization changes.
+    The automaton is built once: add patterns to a new one to change them.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, H]] = ()) -> None:
+        """Build the automaton.
+
+        Args:
+            patterns: The patterns and their references. Patterns without a letter
+                or digit are ignored, the last reference of a repeated pattern wins.
+        """
+        #: (state, character) -> next state, the trie of the patterns
+        self.transitions: dict[tuple[int, str], int] = {}
+        #: state -> state of its longest proper suffix in the trie
+        self.fail: list[int] = [0]
+        #: state -> (pattern length, reference) if a pattern ends there
+        self.outputs: list[tuple[int, H] | None] = [None]
+        #: state -> next state on the fail chain where a pattern ends (0 if none)
+        self.links: list[int] = [0]
+        for pattern, reference in patterns:
+            pattern = _normalize(pattern)
+            if not any(c.isalnum() for c in pattern):
+                continue
+            state = 0
+            for character in pattern:
+                following = self.transitions.get((state, character))
+                if following is None:
+                    following = self.transitions[state, character] = len(self.fail)
+                    self.fail.append(0)
+                    self.outputs.append(None)
+                    self.links.append(0)
+                state = following
+            self.outputs[state] = (len(pattern), reference)
+        # breadth first: a state's fail state is always computed before it
+        children: dict[int, list[tuple[str, int]]] = {}
+        for (state, character), following in self.transitions.items():
+            children.setdefault(state, []).append((character, following))
+        queue = [following for _, following in children.get(0, [])]
+        for state in queue:
+            for character, following in children.get(state, []):
+                fail = self.fail[state]
+                while fail and (fail, character) not in self.transitions:
+                    fail = self.fail[fail]
+                fail = self.transitions.get((fail, character), 0)
+                self.fail[following] = fail
+                self.links[following] = fail if self.outputs[fail] else self.links[fail]
+                queue.append(following)
+
+    def __len__(self) -> int:
+        """Return the number of states."""
+        return len(self.fail)
+
+    def find(self, text: str) -> list[Mention[H]]:
+        """Find the patterns in a text.
+
+        Returns:
+            The patterns found, whole words only, without overlaps, in text order.
+        """
+        normalized, origins = _normalize_with_origins(text)
+        found: list[tuple[int, int, H]] = []
+        state = 0
+        for end, character in enumerate(normalized, 1):
+            while state and (state, character) not in self.transitions:
+                state = self.fail[state]
+            state = self.transitions.get((state, character), 0)
+            match = state if self.outputs[state] else self.links[state]
+            while match:
+                output = self.outputs[match]
+                assert output is not None
+                length, reference = output
+                start = end - length
+                if _is_boundary(normalized, start - 1) and _is_boundary(
+                    normalized, end
+                ):
+                    found.append((start, end, reference))
+                match = self.links[match]
+        # leftmost longest, without overlaps
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        ret: list[Mention[H]] = []
+        position = 0
+        for start, end, reference in found:
+            if start < position:
+                continue
+            ret.append(Mention(origins[start], origins[end - 1] + 1, reference))
+            position = end
+        return ret
+
+
+def _normalize(text: str) -> str:
+    """Normalize a text as `normalize` does, without stripping it."""
+    return text.lower() if text.isascii() else unidecode.unidecode(text).lower()
+
+
+def _normalize_with_origins(text: str) -> tuple[str, list[int]]:
+    """Normalize a text, with the position of each normalized character in it."""
+    if text.isascii():
+        return text.lower(), list(range(len(text)))
+    normalized: list[str] = []
+    origins: list[int] = []
+    for position, character in enumerate(text):
+        character = _normalize(character)
+        normalized.append(character)
+        origins.extend([position] * len(character))
+    return "".join(normalized), origins
+
+
+def _is_boundary(text: str, position: int) -> bool:
+    """Check if a position of a text is out of a word (or out of the text)."""
+    return not 0 <= position < len(text) or not text[position].isalnum()
@@ -1,31 +1,228 @@
 """Fuzzy dictionary."""
 
-from typing import Any, cast
+from typing import Any, NamedTuple, cast
 from collections.abc import (
     Hashable,
     ItemsView,
+    Iterable,
     Iterator,
     Sequence,
     Mapping,
     MutableMapping,
 )
+from enum import StrEnum
 import collections
 import difflib
 import logging
+import math
+import os
+import tempfile
+import threading
 
+import msgspec.json
 
+from .pickling import PicklableLocks
 from .string import normalize
 
 
 LOG = logging.getLogger("krcg")
 
 
-class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
+class CloseMatches:
+    """An index of string keys by character bigram, for difflib close matches.
+
+    `difflib.get_close_matches` scores every key against the word. This index
+    only hands it the keys that can reach the cutoff, with the same result:
+
+    - a ratio of `2 * M / T` (M matching characters, T the length of both strings)
+      bounds the length of the key around the length of the word;
+    - M characters matching in blocks, each gap between two blocks taking an
+      unmatched character, share at least `3 * M - T - 1` bigrams.
+
+    Keys are bucketed by length and bigram: a lookup only reads the buckets of
+    the lengths that can match, for the bigrams of the word.
+    """
+
+    def __init__(self) -> None:
+        """Constructor."""
+        # (bigram, key length) -> {key: occurrences of the bigram in the key}
+        self.grams: dict[tuple[str, int], dict[str, int]] = {}
+        # key length -> keys
+        self.lengths: dict[int, set[str]] = {}
+
+    @staticmethod
+    def _grams(key: str) -> collections.Counter[str]:
+        """Count the bigrams of a key."""
+        return collections.Counter(key[i : i + 2] for i in range(len(key) - 1))
+
+    def add(self, key: str) -> None:
+        """Index a key."""
+        self.lengths.setdefault(len(key), set()).add(key)
+        for gram, count in self._grams(key).items():
+            self.grams.setdefault((gram, len(key)), {})[key] = count
+
+    def remove(self, key: str) -> None:
+        """Remove a key from the index."""
+        keys = self.lengths.get(len(key))
+        if keys is None or key not in keys:
+            return
+        keys.discard(key)
+        if not keys:
+            del self.lengths[len(key)]
+        for gram in self._grams(key):
+            bucket = self.grams.get((gram, len(key)))
+            if bucket is None:
+                continue
+            bucket.pop(key, None)
+            if not bucket:
+                del self.grams[gram, len(key)]
+
+    def clear(self) -> None:
+        """Clear the index."""
+        self.grams.clear()
+        self.lengths.clear()
+
+    def candidates(self, word: str, cutoff: float) -> list[str]:
+        """The keys that may reach the cutoff ratio against the word."""
+        if cutoff <= 0:
+            return [key for keys in self.lengths.values() for key in keys]
+        grams = self._grams(word)
+        ret = []
+        # 2 * min(len) / T >= cutoff
+        low = math.ceil(len(word) * cutoff / (2 - cutoff) - 1e-9)
+        high = math.floor(len(word) * (2 - cutoff) / cutoff + 1e-9)
+        for length in range(low, high + 1):
+            if length not in self.lengths:
+                continue
+            total = len(word) + length
+            matching = math.ceil(cutoff * total / 2 - 1e-9)
+            required = 3 * matching - total - 1
+            if required <= 0:
+                # too short to rely on bigrams: every key of this length is a candidate
+                ret.extend(self.lengths[length])
+                continue
+            shared: collections.Counter[str] = collections.Counter()
+            for gram, count in grams.items():
+                bucket = self.grams.get((gram, length))
+                if not bucket:
+                    continue
+                if count == 1:
+                    # the common case, counted in C
+                    shared.update(bucket.keys())
+                else:
+                    for key, key_count in bucket.items():
+                        shared[key] += min(count, key_count)
+            ret.extend(key for key, count in shared.items() if count >= required)
+        return ret
+
+    def match(self, word: str, cutoff: float) -> str | None:
+        """The best close match of the word, as `difflib.get_close_matches`."""
+        matches = difflib.get_close_matches(
+            word, self.candidates(word, cutoff), n=1, cutoff=cutoff
+        )
+        return matches[0] if matches else None
+
+
+class _StoreFile(msgspec.Struct):
+    """The content of an alias store file."""
+
+    version: str
+    aliases: dict[str, str]
+
+
+class AliasStore:
+    """An on-disk store of learned aliases (misspelling -> key), as JSON.
+
+    The aliases are valid for a version of the keys only: the file of another
+    version is ignored, then replaced. A write merges the aliases with the file
+    content, and replaces the file atomically, so processes sharing a store add up
+    what they learn.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], version: str = "") -> None:
+        """Constructor.
+
+        Args:
+            path: The file path (it is created on first write).
+            version: The version of the keys the aliases resolve to.
+        """
+        self.path = os.fspath(path)
+        self.version = version
+        # guards the read-merge-write cycle
+        self._lock = threading.Lock()
+
+    def load(self) -> dict[str, str]:
+        """Read the aliases, none if the file is missing or of another version."""
+        try:
+            with open(self.path, "rb") as f:
+                content = msgspec.json.decode(f.read(), type=_StoreFile)
+        except (OSError, msgspec.DecodeError):
+            return {}
+        if content.version != self.version:
+            return {}
+        return content.aliases
+
+    def save(self, aliases: Mapping[str, str]) -> None:
+        """Add aliases to the store."""
+        with self._lock:
+            content = _StoreFile(self.version, {**self.load(), **aliases})
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(msgspec.json.encode(content))
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a FuzzyDict cache, as `functools.lru_cache` gives them."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    evictions: int
+
+
+class Match(StrEnum):
+    """How a key matched in a FuzzyDict."""
+
+    EXACT = "Exact"
+    ALIAS = "Alias"
+    FUZZY = "Fuzzy"
+    MISSING = "Missing"
+
+
+class Lookup[H: Hashable, T](NamedTuple):
+    """The result of a key lookup: how it matched, the key matched and its value."""
+
+    match: Match
+    key: H | None = None
+    value: T | None = None
+
+
+class FuzzyDict[H: Hashable, T](PicklableLocks, MutableMapping[H, T]):
     """A dict providing "fuzzy matching" of its keys.
 
     It matches keys that are "close enough" if there is no exact match, and
     provides the ability to specify aliases for certain keys. Aliases are only
     matched exactly (not closely like normal keys).
+
+    Fuzzy matches are remembered in two bounded LRU caches, so a repeated miss
+    costs a single dict probe: the learned aliases (misspellings and their match)
+    and the negative cache (misspellings matching nothing). Unlike the aliases
+    given with `add_alias`, the least recently used entries are evicted.
+
+    Lookups can run from concurrent threads (tested with the GIL only): the caches
+    are updated under a lock, held for the cache probes only, not during fuzzy
+    matching.
+
+    The learned aliases can outlive the process: `attach` an `AliasStore` to load
+    the aliases it holds, and `flush` the new ones to it. Lookups only queue them,
+    they never write.
     """
 
     def __init__(
@@ -35,6 +232,8 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
         threshold: int = 6,
         cutoff: float = 0.85,
         aliases: Mapping[Any, Any] | None = None,
+        learned_size: int = 4096,
+        misses_size: int = 4096,
     ) -> None:
         """Constructor.
 
@@ -43,11 +242,36 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
             threshold: Minimum string length for fuzzy matching.
             cutoff: Minimum similarity to consider a close candidate a match.
             aliases: Optional mapping of alias keys to canonical keys.
+            learned_size: Maximum number of fuzzy matches remembered.
+            misses_size: Maximum number of failed fuzzy matches remembered.
         """
         self._threshold = threshold
         self._cutoff = cutoff
         self._aliases: dict[Hashable, H] = dict(aliases) if aliases else {}
         self._dict: dict[H, T] = dict(data) if data else {}
+        self._close_matches = CloseMatches()
+        for key in self._dict:
+            if isinstance(key, str):
+                self._close_matches.add(key)
+        self._learned: collections.OrderedDict[Hashable, H] = collections.OrderedDict()
+        self._learned_size = learned_size
+        self._misses: collections.OrderedDict[Hashable, None] = (
+            collections.OrderedDict()
+        )
+        self._misses_size = misses_size
+        # hits and misses, per cache
+        self._stats: collections.Counter[str] = collections.Counter()
+        # guards the caches and their statistics
+        self._lock = threading.Lock()
+        self._store: AliasStore | None = None
+        # fuzzy matches learned since the last write to the store
+        self._unsaved: dict[str, str] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled, the store stays with the original."""
+        state = super().__getstate__()
+        state["_store"], state["_unsaved"] = None, {}
+        return state
 
     def _fuzzy_match(self, key: Hashable) -> H | None:
         """Use difflib to match incomplete or misspelled keys."""
@@ -55,18 +279,46 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
             return None
         if len(key) < self._threshold:
             return None
-        matches = difflib.get_close_matches(
-            key,
-            [k for k in self._dict.keys() if isinstance(k, Sequence)],
-            n=1,
-            cutoff=self._cutoff,
-        )
-        if matches:
+        if isinstance(key, str):
+            match = self._close_matches.match(key, self._cutoff)
+            matches = [match] if match is not None else []
+        else:
+            matches = difflib.get_close_matches(
+                key,
+                [k for k in self._dict.keys() if isinstance(k, Sequence)],
+                n=1,
+                cutoff=self._cutoff,
+            )
+        with self._lock:
+            if not matches:
+                self._stats["negative_misses"] += 1
+                self._remember(self._misses, key, None, self._misses_size, "negative")
+                return None
             result = cast(H, matches[0])
             LOG.debug('"%s" matched "%s"', key, result)
-            self.add_alias(key, result)
-            return result
-        return None
+            self._stats["learned_misses"] += 1
+            self._remember(self._learned, key, result, self._learned_size, "learned")
+            if self._store and isinstance(key, str) and isinstance(result, str):
+                self._unsaved[key] = result
+        return result
+
+    def _remember(
+        self,
+        cache: collections.OrderedDict[Hashable, Any],
+        key: Hashable,
+        value: Any,
+        size: int,
+        name: str,
+    ) -> None:
+        """Put a key in a bounded cache, evicting the least recently used.
+
+        The lock must be held.
+        """
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > size:
+            cache.popitem(last=False)
+            self._stats[f"{name}_evictions"] += 1
 
     def add_alias(self, alias: Hashable, value: H) -> None:
         """Add an alias to the dict.
@@ -75,11 +327,91 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
         """
         alias = normalize(alias)
         self._aliases[alias] = value
+        with self._lock:
+            self._misses.clear()
+
+    def learn(self, aliases: Mapping[Any, Any]) -> int:
+        """Seed the learned aliases, e.g. with fuzzy matches learned by another process.
+
+        Aliases of a key, or to a key missing from the dict, are ignored.
+
+        Returns:
+            The number of aliases learned.
+        """
+        ret = 0
+        with self._lock:
+            for alias, key in aliases.items():
+                alias, key = normalize(alias), normalize(key)
+                if alias in self._dict or key not in self._dict:
+                    continue
+                self._remember(self._learned, alias, key, self._learned_size, "learned")
+                ret += 1
+        return ret
+
+    def learned(self) -> dict[Hashable, H]:
+        """The learned aliases (misspelling -> key), least recently used first."""
+        with self._lock:
+            return dict(self._learned)
+
+    def attach(self, store: AliasStore) -> int:
+        """Keep the learned aliases in a store: learn those it has, queue new ones.
+
+        The new aliases are only written by `flush`: call it before exiting.
+
+        Returns:
+            The number of aliases learned from the store.
+        """
+        ret = self.learn(store.load())
+        with self._lock:
+            self._store = store
+        return ret
+
+    def flush(self) -> None:
+        """Write the aliases learned since the last write to the store, if any.
+
+        If the write fails, the aliases are kept for the next one.
+        """
+        with self._lock:
+            store, unsaved, self._unsaved = self._store, self._unsaved, {}
+        if not (store and unsaved):
+            return
+        try:
+            store.save(unsaved)
+        except BaseException:
+            with self._lock:
+                self._unsaved = {**unsaved, **self._unsaved}
+            raise
+
+    def cache_info(self) -> dict[str, CacheInfo]:
+        """Statistics of the learned aliases and negative caches.
+
+        For the learned aliases, hits are lookups they resolved and misses the
+        fuzzy matches they learned. For the negative cache, hits are lookups it
+        failed right away and misses the failed fuzzy matches it remembered.
+        """
+        with self._lock:
+            return {
+                name: CacheInfo(
+                    hits=self._stats[f"{name}_hits"],
+                    misses=self._stats[f"{name}_misses"],
+                    maxsize=size,
+                    currsize=len(cache),
+                    evictions=self._stats[f"{name}_evictions"],
+                )
+                for name, cache, size in [
+                    ("learned", self._learned, self._learned_size),
+                    ("negative", self._misses, self._misses_size),
+                ]
+            }
 
     def clear(self) -> None:
         """Clear the dict."""
         self._dict.clear()
         self._aliases.clear()
+        self._close_matches.clear()
+        with self._lock:
+            self._learned.clear()
+            self._misses.clear()
 
     def items(self) -> ItemsView[H, T]:
         """Return the dict items.
@@ -104,11 +436,60 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
             # aliases must match exactly
             if key in self._aliases:
                 return self._dict[normalize(self._aliases[key])]
-            fuzzy_match = self._fuzzy_match(key)
-            if fuzzy_match:
+            fuzzy_match = self._cached_fuzzy_match(key)
+            if fuzzy_match is not None:
                 return self._dict[fuzzy_match]
             raise
 
+    def _cached_fuzzy_match(self, key: Hashable) -> H | None:
+        """Fuzzy match a normalized key, through the learned and negative caches."""
+        with self._lock:
+            if key in self._learned:
+                self._stats["learned_hits"] += 1
+                self._learned.move_to_end(key)
+                return self._learned[key]
+            if key in self._misses:
+                self._stats["negative_hits"] += 1
+                self._misses.move_to_end(key)
+                return None
+        return self._fuzzy_match(key) or None
+
+    def get_many(self, keys: Iterable[Hashable]) -> dict[Hashable, Lookup[H, T]]:
+        """Look many keys up at once, telling how each matched.
+
+        Exact keys and aliases are resolved first, in bulk. Each distinct
+        leftover (once normalized) goes through fuzzy matching once only.
+
+        Args:
+            keys: The keys to look up, repeats allowed.
+
+        Returns:
+            The lookup of every distinct key given, in order.
+        """
+        missing: Lookup[H, T] = Lookup(Match.MISSING)
+        # deduplicated, in order: the missing placeholders are filled below
+        ret: dict[Hashable, Lookup[H, T]] = dict.fromkeys(keys, missing)
+        # normalized key -> keys given
+        leftovers: dict[Hashable, list[Hashable]] = {}
+        data, aliases = self._dict, self._aliases
+        for key in ret:
+            normalized = normalize(key)
+            if normalized in data:
+                ret[key] = Lookup(Match.EXACT, normalized, data[normalized])
+            elif normalized in aliases:
+                target = normalize(aliases[normalized])
+                ret[key] = Lookup(Match.ALIAS, target, data[target])
+            else:
+                leftovers.setdefault(normalized, []).append(key)
+        for normalized, originals in leftovers.items():
+            match = self._cached_fuzzy_match(normalized)
+            if match is None:
+                continue
+            lookup = Lookup(Match.FUZZY, match, data[match])
+            for key in originals:
+                ret[key] = lookup
+        return ret
+
     def __contains__(self, key: object) -> bool:
         """Check if a key is in the dict (does fuzzy match)."""
         try:
@@ -119,11 +500,23 @@ class FuzzyDict[H: Hashable, T](MutableMapping[H, T]):
 
     def __setitem__(self, key: H, value: Any) -> None:
         """Set a key."""
-        self._dict[normalize(key)] = value
+        key = normalize(key)
+        self._dict[key] = value
+        if isinstance(key, str):
+            self._close_matches.add(key)
+        # a past miss may match the new key
+        with self._lock:
+            self._misses.clear()
 
     def __delitem__(self, key: H) -> None:
         """Delete a key."""
-        del self._dict[normalize(key)]
+        key = normalize(key)
+        del self._dict[key]
+        if isinstance(key, str):
+            self._close_matches.remove(key)
+        with self._lock:
+            for alias in [k for k, v in self._learned.items() if v == key]:
+                del self._learned[alias]
 
     # Required by MutableMapping
     def __len__(self) -> int:
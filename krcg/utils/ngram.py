@@ -0,0 +1,139 @@
+"""A character n-gram index for substring (phrase and infix) text search."""
+
+from collections.abc import Hashable
+from typing import Any
+import re
+import threading
+
+from .pickling import PicklableLocks
+from .string import normalize
+
+#: card text markup ("<Card Name>") does not take part in a phrase
+RE_MARKUP = re.compile(r"[<>]")
+
+
+class NgramIndex[H: Hashable](PicklableLocks):
+    """An index of texts by their character trigrams, for substring search.
+
+    Every trigram of a (normalized) text points to the references holding it. A
+    query intersects the postings of its own trigrams, rarest first, then checks
+    the few remaining candidates for the actual substring: the cost depends on the
+    rarest trigram of the query, not on the number of texts indexed.
+
+    Like the Trie, matches are case-insensitive and use unidecode. Whitespace runs
+    count as a single space, so a phrase matches across line breaks.
+
+    The trigrams are indexed on the first search, kept in sync from then on, and
+    left out of pickles: only the texts are kept until a phrase is searched.
+    """
+
+    N = 3
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self.texts: dict[H, list[str]] = {}
+        #: trigram -> references of the texts holding it, None until a search
+        self.grams: dict[str, set[H]] | None = None
+        # guards the indexing of the trigrams
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled, trigrams are indexed on demand."""
+        state = super().__getstate__()
+        state["grams"] = None
+        return state
+
+    @staticmethod
+    def _prepare(text: str) -> str:
+        """Normalize text and collapse whitespace."""
+        return " ".join(normalize(RE_MARKUP.sub("", text)).split())
+
+    @classmethod
+    def _grams(cls, text: str) -> set[str]:
+        """The distinct n-grams of a prepared text."""
+        return {text[i : i + cls.N] for i in range(len(text) - cls.N + 1)}
+
+    def add(self, text: str, reference: H) -> None:
+        """Add text to the index.
+
+        Args:
+            text: The text to add.
+            reference: The reference to return on a match.
+        """
+        text = self._prepare(text)
+        if not text:
+            return
+        self.texts.setdefault(reference, []).append(text)
+        if self.grams is not None:
+            for gram in self._grams(text):
+                self.grams.setdefault(gram, set()).add(reference)
+
+    def remove(self, reference: H, text: str | None = None) -> None:
+        """Remove a reference from the index.
+
+        Args:
+            reference: The reference to remove.
+            text: Only remove this text of the reference, not all of them.
+        """
+        texts = self.texts.pop(reference, [])
+        if text is not None:
+            text = self._prepare(text)
+            kept = list(texts)
+            if text in kept:
+                kept.remove(text)
+            texts = [text] if len(kept) < len(texts) else []
+            if kept:
+                self.texts[reference] = kept
+        if self.grams is None:
+            return
+        # a trigram still held by another text of the reference keeps it
+        grams = set().union(*map(self._grams, texts))
+        grams -= set().union(*map(self._grams, self.texts.get(reference, [])))
+        for gram in grams:
+            references = self.grams.get(gram)
+            if references is None:
+                continue
+            references.discard(reference)
+            if not references:
+                del self.grams[gram]
+
+    def search(self, text: str) -> set[H]:
+        """Search for the references whose text contains the given text.
+
+        A query shorter than a trigram has no postings: it scans every text.
+
+        Args:
+            text: The substring to look for (a phrase, or part of a word).
+
+        Returns:
+            The matching references.
+        """
+        text = self._prepare(text)
+        if not text:
+            return set()
+        index = self.grams
+        if index is None:
+            with self._lock:
+                if self.grams is None:
+                    self.grams = self._index()
+                index = self.grams
+        grams = self._grams(text)
+        if grams:
+            postings = sorted((index.get(g, set()) for g in grams), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            candidates = set(self.texts)
+        return {
+            reference
+            for reference in candidates
+            if any(text in t for t in self.texts[reference])
+        }
+
+    def _index(self) -> dict[str, set[H]]:
+        """Index the trigrams of every text."""
+        grams: dict[str, set[H]] = {}
+        for reference, texts in self.texts.items():
+            for text in texts:
+                for gram in self._grams(text):
+                    grams.setdefault(gram, set()).add(reference)
+        return grams
@@ -0,0 +1,27 @@
+"""Pickle support for objects holding locks."""
+
+from typing import Any, ClassVar
+import threading
+
+
+class PicklableLocks:
+    """A mixin to pickle (and copy) an object holding locks, which can't be pickled.
+
+    The locks named in `_LOCKS` are left out of the pickled state, and new ones
+    created for the copy. Extend `__getstate__` to reset caches as well.
+    """
+
+    _LOCKS: ClassVar[tuple[str, ...]] = ("_lock",)
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Pickle support: locks can't be pickled."""
+        state = self.__dict__.copy()
+        for name in self._LOCKS:
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Pickle support: new locks for the copy."""
+        self.__dict__.update(state)
+        for name in self._LOCKS:
+            setattr(self, name, threading.Lock())
@@ -0,0 +1,69 @@
+"""A sorted-array index of comparable keys, for range search."""
+
+from collections.abc import Hashable
+from typing import Any
+import bisect
+
+
+class RangeIndex[H: Hashable]:
+    """An index of references by a comparable key (a number, a date).
+
+    Keys are kept in a sorted array, references in a parallel one: a range search
+    is two bisections and a slice, whatever the number of references indexed.
+    Each reference has a single key.
+    """
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self.keys: list[Any] = []
+        self.references: list[H] = []
+        #: reference -> its key, to remove it
+        self.key_of: dict[H, Any] = {}
+
+    def add(self, key: Any, reference: H) -> None:
+        """Index a reference under a key, replacing its former key if any."""
+        self.remove(reference)
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key)
+        self.references.insert(i, reference)
+        self.key_of[reference] = key
+
+    def remove(self, reference: H) -> None:
+        """Remove a reference from the index, if present."""
+        if reference not in self.key_of:
+            return
+        key = self.key_of.pop(reference)
+        low = bisect.bisect_left(self.keys, key)
+        high = bisect.bisect_right(self.keys, key)
+        i = self.references.index(reference, low, high)
+        del self.keys[i]
+        del self.references[i]
+
+    def search(
+        self,
+        low: Any = None,
+        high: Any = None,
+        *,
+        low_inclusive: bool = True,
+        high_inclusive: bool = True,
+    ) -> set[H]:
+        """The references whose key is within bounds.
+
+        Args:
+            low: The lower bound, None for no lower bound.
+            high: The upper bound, None for no upper bound.
+            low_inclusive: Whether the lower bound itself matches.
+            high_inclusive: Whether the upper bound itself matches.
+        """
+        start, end = 0, len(self.keys)
+        if low is not None:
+            bound = bisect.bisect_left if low_inclusive else bisect.bisect_right
+            start = bound(self.keys, low)
+        if high is not None:
+            bound = bisect.bisect_right if high_inclusive else bisect.bisect_left
+            end = bound(self.keys, high)
+        return set(self.references[start:end])
+
+    def __len__(self) -> int:
+        """Return the number of references indexed."""
+        return len(self.references)
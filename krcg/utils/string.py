@@ -1,11 +1,23 @@
 """String utilities."""
 
 from typing import Any
+import functools
 import unidecode
 
 
 def normalize(s: Any) -> Any:
-    """Normalize a string for indexing: unidecode and lowercase."""
+    """Normalize a string for indexing: unidecode and lowercase.
+
+    ASCII strings, the vast majority, skip unidecode. Other strings are memoized.
+    """
     if not isinstance(s, str):
         return s
+    if s.isascii():
+        return s.lower().strip()
+    return _normalize_unicode(s)
+
+
+@functools.lru_cache(maxsize=16384)
+def _normalize_unicode(s: str) -> str:
+    """Normalize a non-ASCII string."""
     return unidecode.unidecode(s).lower().strip()
@@ -0,0 +1,104 @@
+"""A TF-IDF sparse matrix of texts, for cosine similarity search."""
+
+from collections.abc import Hashable, Iterable
+import collections
+import math
+import re
+
+import numpy
+
+from .string import normalize
+
+#: words, card text symbols ([pot], [ACTION]) included
+RE_WORD = re.compile(r"\w+")
+
+
+class TfIdf[H: Hashable]:
+    """A TF-IDF matrix of texts, one row per reference, for "more like this".
+
+    The matrix is stored sparse, as numpy arrays of its non-zero coefficients (row,
+    column and value), each row normalized: the cosine similarity of a row with
+    every other is a single vectorized product.
+
+    Terms are normalized words, weighted by a sublinear term frequency
+    (1 + log tf) and a smoothed inverse document frequency.
+    """
+
+    def __init__(self, texts: Iterable[tuple[H, str]] = ()) -> None:
+        """Build the matrix.
+
+        Args:
+            texts: The references and their texts.
+        """
+        #: row -> reference
+        self.references: list[H] = []
+        #: reference -> row
+        self.rows_of: dict[H, int] = {}
+        #: term -> column
+        self.vocabulary: dict[str, int] = {}
+        counts: list[collections.Counter[str]] = []
+        for reference, text in texts:
+            terms = collections.Counter(RE_WORD.findall(normalize(text)))
+            if not terms:
+                continue
+            self.rows_of[reference] = len(self.references)
+            self.references.append(reference)
+            counts.append(terms)
+            for term in terms:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+        documents = collections.Counter(t for terms in counts for t in terms)
+        size = len(counts)
+        self.idf = numpy.zeros(len(self.vocabulary), dtype=numpy.float32)
+        for term, column in self.vocabulary.items():
+            self.idf[column] = math.log((1 + size) / (1 + documents[term])) + 1
+        rows, columns, values = [], [], []
+        for row, terms in enumerate(counts):
+            rows.extend([row] * len(terms))
+            columns.extend(self.vocabulary[t] for t in terms)
+            values.extend(1 + math.log(c) for c in terms.values())
+        self.rows = numpy.array(rows, dtype=numpy.int32)
+        self.columns = numpy.array(columns, dtype=numpy.int32)
+        self.values = numpy.array(values, dtype=numpy.float32) * self.idf[self.columns]
+        norms = numpy.sqrt(
+            numpy.bincount(self.rows, weights=self.values**2, minlength=size)
+        )
+        self.values /= norms[self.rows].astype(numpy.float32)
+        #: row -> slice of its coefficients (rows are contiguous)
+        self.offsets = numpy.searchsorted(self.rows, numpy.arange(size + 1))
+
+    def __len__(self) -> int:
+        """Return the number of references (rows)."""
+        return len(self.references)
+
+    def __contains__(self, reference: object) -> bool:
+        """Check if a reference has a row."""
+        return reference in self.rows_of
+
+    def similar(self, reference: H, n: int = 10) -> list[tuple[H, float]]:
+        """The references whose text is most similar to the reference's.
+
+        Args:
+            reference: The reference to compare to.
+            n: The number of references to return.
+
+        Returns:
+            References and their cosine similarity, most similar first. The
+            reference itself and references sharing no term are excluded.
+        """
+        row = self.rows_of.get(reference)
+        if row is None:
+            return []
+        start, end = self.offsets[row], self.offsets[row + 1]
+        query = numpy.zeros(len(self.vocabulary), dtype=numpy.float32)
+        query[self.columns[start:end]] = self.values[start:end]
+        # the product of the matrix and the query: one pass on the coefficients
+        scores = numpy.bincount(
+            self.rows,
+            weights=self.values * query[self.columns],
+            minlength=len(self.references),
+        )
+        scores[row] = 0
+        n = min(n, len(scores))
+        top = numpy.argpartition(-scores, n - 1)[:n] if n else []
+        top = sorted(top, key=lambda i: (-scores[i], i))
+        return [(self.references[i], float(scores[i])) for i in top if scores[i] > 0]
@@ -11,12 +11,7 @@ from .string import normalize
 LOG = logging.getLogger("krcg")
 
 
-def _default_trie_factory() -> "collections.defaultdict[Any, int]":
-    """Factory function for Trie default values."""
-    return collections.defaultdict(int)
-
-
-class Trie[H: Hashable](collections.defaultdict[str, dict[H, int]]):
+class Trie[H: Hashable](dict[str, dict[H, int]]):
     """A Trie structure for text search.
 
     It relies on a Python dict with following structure:
@@ -28,17 +23,20 @@ class Trie[H: Hashable](collections.defaultdict[str, dict[H, int]]):
     of the prefix and the position in the text (matching first word is worth double).
 
     The matches are case-insensitive and use unidecode to handle unicode characters.
+
+    It is a plain dict, not a defaultdict: reading a missing prefix inserts nothing,
+    so searches have no side effect and can run concurrently.
     """
 
     def __init__(self, data: Mapping[str, dict[H, int]] | None = None) -> None:
         """Constructor."""
-        super().__init__(_default_trie_factory)
+        super().__init__()
         # If args provided, update with them (for unpickling)
         if data:
             self.update(data)
 
     def __reduce_ex__(self, protocol: SupportsIndex) -> tuple[Any, ...]:
-        """Custom pickle support to avoid issues with defaultdict."""
+        """Custom pickle support, leaving out the generic alias of the instance."""
         return (
             self.__class__,
             (dict(self),),
@@ -66,11 +64,33 @@ class Trie[H: Hashable](collections.defaultdict[str, dict[H, int]]):
             reference = cast(H, text)
         for e, part in enumerate(Trie._split(text)):
             for i in range(1, len(part) + 1):
-                self[part[:i]][reference] += (
+                references = self.setdefault(part[:i], {})
+                references[reference] = references.get(reference, 0) + (
                     # double score for matching name start
                     i * (2 if e == 0 else 1)
                 )
 
+    def remove(self, text: str, reference: H) -> None:
+        """Remove a reference from every prefix of the text.
+
+        The reference is removed whole, whatever other text added it to the same
+        prefixes: remove every text of a reference at once.
+
+        Args:
+            text: The text that was added.
+            reference: The reference to remove.
+        """
+        if reference is None:
+            reference = cast(H, text)
+        for part in Trie._split(text):
+            for i in range(1, len(part) + 1):
+                references = self.get(part[:i])
+                if references is None:
+                    continue
+                references.pop(reference, None)
+                if not references:
+                    del self[part[:i]]
+
     def search(self, text: str) -> collections.Counter[H]:
         """Search text in the trie.
 
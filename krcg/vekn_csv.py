@@ -192,11 +192,6 @@ def card_from_vekn[T: models.Card](
 ) -> T:
     """Create a card from a VEKN CSV line."""
     card = cls(
-        kind=(
-            models.Card.Kind.CRYPT
-            if issubclass(cls, models.CryptCard)
-            else models.Card.Kind.LIBRARY
-        ),
         id=int(line["Id"]),
         printed_name=prefix_name(line["Name"]),
         types=parse_enum_list(line["Type"], models.Card.Type, "/"),
@@ -0,0 +1,40 @@
+"""Measure the cost of building, pickling and loading the cards library.
+
+>>> python profiling/index.py
+
+The structures only some callers need (name completions, phrase n-grams, TF-IDF
+matrices, the names automaton) are built on first use and left out of pickles:
+`index()`, the pickled cache and its load time stay those of the search indexes.
+The first call needing one of them pays for it, shown last.
+"""
+
+from collections.abc import Callable
+import pickle
+import time
+
+from krcg import loader
+
+
+def timed[T](label: str, function: Callable[[], T], repeat: int = 3) -> T:
+    """Print the best time of a function, return its last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label}: {best:.3f} s")
+    return result
+
+
+cards = timed("load_local", loader.load_local)
+timed("index", cards.index)
+data = timed("pickle", lambda: pickle.dumps(cards))
+print(f"pickled size: {len(data) / 1e6:.1f} MB")
+timed("unpickle", lambda: pickle.loads(data))
+# first use, on a fresh copy
+fresh = pickle.loads(data)
+timed("first complete", lambda: fresh.complete("ala"), repeat=1)
+timed("next complete", lambda: fresh.complete("ala"), repeat=1)
+phrase = '"does not unlock"'
+timed("first phrase search", lambda: fresh.search(card_text=phrase), repeat=1)
+timed("next phrase search", lambda: fresh.search(card_text=phrase), repeat=1)
@@ -0,0 +1,38 @@
+"""Microbenchmark of the string normalization used by every card lookup.
+
+>>> python profiling/normalize.py
+
+Compares the plain unidecode normalization to `utils.normalize` (ASCII fast path
+and memoized unicode) on every card name, translated name and decklist line.
+"""
+
+import timeit
+
+import unidecode
+
+from krcg import providers
+from krcg import twda
+from krcg import utils
+from krcg.loader import load_local
+
+
+def reference(s: str) -> str:
+    """Normalization without the fast path."""
+    return unidecode.unidecode(s).lower().strip()
+
+
+cards = load_local()
+strings = [card.full_name for card in cards.values()]
+strings += [t.name for card in cards.values() for t in card.i18n.values()]
+decks = list(twda.load_local().values())[:200]
+strings += [
+    line for deck in decks for line in providers.serialize_txt(deck).splitlines()
+]
+assert all(utils.normalize(s) == reference(s) for s in strings)
+ascii_ratio = sum(s.isascii() for s in strings) / len(strings)
+print(f"{len(strings)} strings, {ascii_ratio:.0%} ASCII")
+for name, function in [("unidecode", reference), ("normalize", utils.normalize)]:
+    seconds = min(
+        timeit.repeat(lambda: [function(s) for s in strings], number=10, repeat=5)
+    )
+    print(f"{name:>10}: {seconds / 10 / len(strings) * 1e9:.0f} ns per string")
@@ -0,0 +1,36 @@
+"""Compare the search latency of the SQLite export with the in-memory index.
+
+>>> python profiling/sqlite.py
+"""
+
+import os
+import tempfile
+import time
+import timeit
+
+from krcg import sqlite
+from krcg.loader import load_local
+
+QUERIES = [
+    {"clan": ["Banu Haqim"], "title": ["Justicar"]},
+    {"capacity": ">=8", "clan": ["Brujah"]},
+    {"discipline": ["ani", "pro"], "n": None},
+    {"card_text": "burn", "n": None},
+    {"card_text": '"does not unlock"', "n": None},
+]
+
+cards = load_local()
+path = os.path.join(tempfile.gettempdir(), "krcg_profiling.db")
+start = time.perf_counter()
+sqlite.export(cards, path)
+print(f"export: {time.perf_counter() - start:.2f} s, {os.path.getsize(path):,} bytes")
+with sqlite.Database(path) as db:
+    for query in QUERIES:
+        memory = min(timeit.repeat(lambda: cards.search(**query), number=10)) / 10
+        disk = min(timeit.repeat(lambda: db.search(**query), number=10)) / 10
+        print(f"{query}: {memory * 1e3:.2f} ms in memory, {disk * 1e3:.2f} ms SQLite")
+    for text in ["a", "pentex"]:
+        memory = min(timeit.repeat(lambda: cards.complete(text), number=10)) / 10
+        disk = min(timeit.repeat(lambda: db.complete(text), number=10)) / 10
+        print(f"complete {text!r}: {memory * 1e3:.2f} ms, {disk * 1e3:.2f} ms SQLite")
+os.unlink(path)
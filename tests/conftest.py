@@ -3,6 +3,8 @@
 Fixtures:
     cards: the cards database, built once per session from the bundled CSVs.
     TWDA: the decks archive, loaded once per session from the bundled snapshot.
+    library: a private copy of the cards, for a test adding or removing some.
+    playtest: a playtest vampire, added to the library for one test.
 
 The ``baseline`` marker flags tests that track live source data (cards, rulings,
 the TWDA). Such a test is expected to drift when the data is re-synced, so a
@@ -10,13 +12,17 @@ failure is downgraded to an amber ``xfail`` ("eyeball it") instead of a hard
 failure. Genuine code regressions live in unmarked tests and fail red.
 """
 
+from collections.abc import Iterator
+import copy
 import os
+import pickle
 import urllib.request
 import urllib.error
 import pytest
 
 from krcg import collections
 from krcg import loader
+from krcg import models
 from krcg import twda
 
 
@@ -32,6 +38,30 @@ def TWDA() -> twda.DecksArchive:
     return twda.load_local()
 
 
+@pytest.fixture(scope="session")
+def _pickled_cards(cards: collections.CardDict) -> bytes:
+    """The pickled cards database, to make private copies of quickly."""
+    return pickle.dumps(cards)
+
+
+@pytest.fixture
+def library(_pickled_cards: bytes) -> collections.CardDict:
+    """A private copy of the cards database, to change in a test."""
+    return pickle.loads(_pickled_cards)
+
+
+@pytest.fixture
+def playtest(library: collections.CardDict) -> Iterator[models.Card]:
+    """A copy of Anson as "Zap" (id 290001), added to the test library.
+
+    Change it, then `library.update` it.
+    """
+    card = copy.deepcopy(library["Anson"])
+    card.id, card.printed_name, card.name_variants = 290001, "Zap", []
+    library.add(card)
+    yield card
+
+
 def _internet_available() -> bool:
     """Check if the internet is available."""
     if os.getenv("FORCE_OFFLINE"):
@@ -0,0 +1,12 @@
+"""Test the Aho-Corasick automaton."""
+
+from krcg import utils
+
+
+def test_aho_corasick() -> None:
+    """No overlap: the longest name wins, each pattern of a text found once."""
+    automaton = utils.AhoCorasick([("crow", 1), ("carrion crows", 2), ("!", 3)])
+    assert automaton.find("Carrion Crows! crow") == [
+        utils.Mention(0, 13, 2),
+        utils.Mention(15, 19, 1),
+    ]
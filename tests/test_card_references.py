@@ -113,6 +113,32 @@ def test_translated_references(cards: collections.CardDict) -> None:
     assert not cards["Trap"].i18n[models.Lang.ES].cards
 
 
+def test_referenced_by(
+    cards: collections.CardDict, library: collections.CardDict
+) -> None:
+    """The reverse references match a scan of every card and ruling."""
+    for card in list(cards.cards())[::40]:
+        references = cards.referenced_by(card)
+        assert [c.id for c in references.cards] == [
+            c.id
+            for c in sorted(cards.cards(), key=lambda c: (c.printed_name, c.id))
+            if card.id in {r.id for r in c.cards}
+        ]
+        for ruled, ruling in references.rulings:
+            assert ruled.id != card.id and card.id in {c.id for c in ruling.cards}
+    doll = cards.referenced_by(cards["Blood Doll"])
+    assert [c.printed_name for c in doll.cards][:2] == ["Tarautas", "Vassily Taltos"]
+    torn = cards.referenced_by(cards["Torn Signpost"], models.Lang.FR)
+    assert [c.printed_name for c in torn.cards] == ["Preternatural Strength"]
+    rulings = cards.referenced_by(cards["Anarch Revolt"]).rulings
+    assert "Delaying Tactics" in {c.printed_name for c, _ in rulings}
+    # removing a card drops what it names
+    vessel = library["Vessel"]
+    assert vessel in library.referenced_by(library["Blood Doll"]).cards
+    library.remove(vessel)
+    assert vessel not in library.referenced_by(library["Blood Doll"]).cards
+
+
 @pytest.mark.baseline
 def test_translated_text_is_clean(cards: collections.CardDict) -> None:
     """The slash of 'et/ou' survives translation, as 'and/or' does in English."""
@@ -1,11 +1,15 @@
 """Test the cards."""
 
 import aiohttp
+import atexit
+import logging
+import pathlib
 import pytest
 import warnings
 
 from krcg import collections
 from krcg import loader
+from krcg import utils
 
 
 @pytest.mark.baseline
@@ -242,3 +246,31 @@ def test_compute_urls_available(cards: collections.CardDict) -> None:
 
     # the default (available=None) stays optimistic
     assert cards["Theo Bell (G2)"].url == base + "theobellg2.jpg"
+
+
+def test_use_aliases(
+    cards: collections.CardDict,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """The learned aliases are written at exit once per library, errors logged."""
+    registered = []
+    monkeypatch.setattr(atexit, "register", lambda *args: registered.append(args))
+    library = collections.CardDict()
+    store = loader.use_aliases(library, str(tmp_path / "aliases.json"))
+    loader.use_aliases(library, str(tmp_path / "other.json"))
+    assert len(registered) == 1
+    # the store is keyed by the card names, not the package version
+    crows = cards["Carrion Crows"]
+    assert store.version == loader.use_aliases(collections.CardDict(), "x").version
+    other = loader.use_aliases(collections.CardDict({crows.id: crows}), "x")
+    assert other.version != store.version
+    # the exit-time write does not fail the exit, and keeps the aliases
+    library.attach(utils.AliasStore(tmp_path, store.version))
+    library._unsaved["carrion crowz"] = "carrion crows"
+    function, *args = registered[0]
+    with caplog.at_level(logging.WARNING, logger="krcg"):
+        function(*args)
+    assert "failed to write the learned aliases" in caplog.text
+    assert library._unsaved == {"carrion crowz": "carrion crows"}
@@ -0,0 +1,75 @@
+"""Test the fuzzy dict, its close matches index and its alias store."""
+
+import copy
+import pathlib
+
+import pytest
+
+from krcg import utils
+
+
+def test_close_matches() -> None:
+    """The bigram index follows the keys added and removed."""
+    index = utils.fuzzy_dict.CloseMatches()
+    index.add("carrion crows")
+    assert index.match("carrion crowz", 0.85) == "carrion crows"
+    index.remove("carrion crows")
+    assert index.match("carrion crowz", 0.85) is None
+    assert not index.grams and not index.lengths
+
+
+def test_fuzzy_caches() -> None:
+    """Fuzzy matches and misses are cached in bounded tiers, apart from aliases."""
+    d = utils.FuzzyDict(
+        {"carrion crows": 1, "govern the unaligned": 2},
+        learned_size=1,
+        misses_size=1,
+    )
+    assert d["carrion crowz"] == 1
+    assert d["carrion crowz"] == 1
+    assert not d._aliases
+    assert d.cache_info()["learned"] == utils.CacheInfo(1, 1, 1, 1, 0)
+    # a second match evicts the first
+    assert d["govern the unalinged"] == 2
+    assert d.cache_info()["learned"].evictions == 1
+    assert list(d._learned) == ["govern the unalinged"]
+    for _ in range(2):
+        with pytest.raises(KeyError):
+            d["zzzzzzzzzzzz"]
+    assert d.cache_info()["negative"] == utils.CacheInfo(1, 1, 1, 1, 0)
+    # a new key invalidates the misses, deleting a key drops what was learned
+    d["zzzzzzzzzzzy"] = 3
+    assert d["zzzzzzzzzzzz"] == 3
+    del d["zzzzzzzzzzzy"]
+    assert not d._learned
+
+
+def test_alias_store(tmp_path: pathlib.Path) -> None:
+    """Learned aliases are written back on flush, and learned by a new process."""
+    store = utils.AliasStore(tmp_path / "aliases.json", "1.0")
+    d = utils.FuzzyDict({"carrion crows": 1, "govern the unaligned": 2})
+    assert d.attach(store) == 0
+    assert d["carrion crowz"] == 1
+    assert d["Govern the Unalinged"] == 2
+    # lookups only queue them
+    assert store.load() == {}
+    d.flush()
+    assert store.load() == {
+        "carrion crowz": "carrion crows",
+        "govern the unalinged": "govern the unaligned",
+    }
+    # a new process resolves them without fuzzy matching
+    other = utils.FuzzyDict({"carrion crows": 1, "govern the unaligned": 2})
+    assert other.attach(store) == 2
+    assert other["carrion crowz"] == 1
+    assert other.cache_info()["learned"].hits == 1
+    assert other.cache_info()["learned"].misses == 0
+    # and added to what the store holds
+    assert other["carrion crowss"] == 1
+    other.flush()
+    assert len(store.load()) == 3
+    # aliases of another version, or to missing keys, are dropped
+    assert utils.AliasStore(store.path, "2.0").load() == {}
+    assert utils.FuzzyDict({"carrion crows": 1}).learn(store.load()) == 2
+    # the store does not follow copies
+    assert copy.deepcopy(other)._store is None
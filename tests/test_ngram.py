@@ -0,0 +1,36 @@
+"""Test the n-gram index of the quoted phrase search."""
+
+import pickle
+
+from krcg import utils
+
+
+def test_ngram_index() -> None:
+    """Trigrams are indexed on the first search, kept in sync, and not pickled."""
+    index = utils.NgramIndex()
+    index.add("Burn a  Vampire", 1)
+    index.add("gain a blood", 2)
+    assert index.grams is None
+    assert index.search("n a vamp") == {1}
+    assert index.grams
+    # once indexed, adding and removing texts keeps the trigrams in sync
+    index.add("a vampire ally", 3)
+    assert index.search("a vampire") == {1, 3}
+    index.remove(1)
+    assert index.search("a vampire") == {3}
+    copy = pickle.loads(pickle.dumps(index))
+    assert copy.grams is None and copy.texts == index.texts
+    assert copy.search("a vampire") == {3}
+
+
+def test_ngram_remove_text() -> None:
+    """Removing one text of a reference keeps its other texts."""
+    index = utils.NgramIndex()
+    index.add("burn a vampire", 1)
+    index.add("a vampire ally", 1)
+    assert index.search("burn") == {1}
+    index.remove(1, "Burn a Vampire")
+    assert index.texts == {1: ["a vampire ally"]}
+    assert index.search("burn") == set() and index.search("a vampire") == {1}
+    index.remove(1, "a vampire ally")
+    assert not index.texts and not index.grams
@@ -0,0 +1,29 @@
+"""Test the pickle support of objects holding locks."""
+
+import copy
+import pickle
+import threading
+
+from krcg import utils
+
+
+class Cache(utils.PicklableLocks):
+    """A value guarded by two locks."""
+
+    _LOCKS = ("_lock", "_other_lock")
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self.value = 1
+        self._lock = threading.Lock()
+        self._other_lock = threading.Lock()
+
+
+def test_picklable_locks() -> None:
+    """Copies get the state, and new locks of their own."""
+    cache = Cache()
+    with cache._lock:
+        for other in [pickle.loads(pickle.dumps(cache)), copy.deepcopy(cache)]:
+            assert other.value == 1
+            assert not other._lock.locked() and not other._other_lock.locked()
+            assert other._lock is not cache._lock
@@ -0,0 +1,84 @@
+"""Test the boolean query language over the card search index."""
+
+import pytest
+
+from krcg import collections
+from krcg import models
+from krcg import query
+
+
+def names(result: collections.SearchResult) -> list[str]:
+    """The names of the cards of a result."""
+    return [c.full_name for c in result]
+
+
+def test_parse() -> None:
+    """Precedence: NOT over AND over OR; terms side by side are ANDed."""
+    clan = query.Term(models.SearchDimension.CLAN, "Banu Haqim")
+    combat = query.Term(models.SearchDimension.TYPE, "Combat")
+    phrase = query.Term(models.SearchDimension.CARD_TEXT, '"does not unlock"')
+    assert query.parse(
+        'clan:"Banu Haqim" type:Combat OR card_text:"does not unlock"'
+    ) == (query.Or((query.And((clan, combat)), phrase)))
+    assert query.parse("NOT type:Combat and -(clan:'x')") == query.And(
+        (
+            query.Not(combat),
+            query.Not(query.Term(models.SearchDimension.CLAN, "'x'")),
+        )
+    )
+    assert query.parse("pool_cost<=2") == query.Term(
+        models.SearchDimension.POOL_COST, "<=2"
+    )
+    assert query.parse("crows") == query.Term(models.SearchDimension.NAME, "crows")
+    for invalid in [
+        "(clan:Brujah",
+        "clan:Brujah)",
+        "foo:bar",
+        "clan<3",
+        "OR",
+        "clan:",
+        "clan:Brujah -",
+        "- clan:Brujah",
+    ]:
+        with pytest.raises(query.QueryError):
+            query.parse(invalid)
+
+
+def test_search(cards: collections.CardDict) -> None:
+    """Queries match what combining search calls would."""
+    search = cards.search_index
+    brujah = search.match({models.SearchDimension.CLAN: ["Brujah"]})
+    potence = search.match({models.SearchDimension.DISCIPLINE: ["POT"]})
+    result = query.search(cards, "clan:Brujah capacity>=8 NOT discipline:POT")
+    assert (
+        result.ordinals
+        == brujah & search.match({models.SearchDimension.CAPACITY: [">=8"]}) - potence
+    )
+    assert names(result) == names(
+        collections.SearchResult(cards.table, result.ordinals)
+    )
+    either = query.search(cards, "(clan:Brujah OR clan:Nosferatu) kind:Crypt")
+    assert either.count() == len(
+        cards.search(clan=["Brujah", "Nosferatu"], kind=["Crypt"], n=None)
+    )
+    assert query.search(cards, "-kind:Crypt").count() == len(
+        cards.search(kind=["Library"], n=None)
+    )
+    assert names(query.search(cards, "carrion crows")) == ["Carrion Crows"]
+    assert cards["Corneilles noires"] in query.search(
+        cards, "name:corneilles", models.Lang.FR
+    )
+    assert not query.search(cards, "")
+    with pytest.raises(query.QueryError, match="invalid term capacity>=x"):
+        query.search(cards, "clan:Brujah capacity>=x")
+    # set dimension values are case insensitive, unless ambiguous
+    assert query.search(cards, "clan:brujah kind:crypt").ordinals == (
+        query.search(cards, "clan:Brujah kind:Crypt").ordinals
+    )
+    assert query.search(cards, "discipline:pot").count() != (
+        query.search(cards, "discipline:POT").count()
+    )
+    with pytest.raises(query.QueryError, match=r"ambiguous discipline: Pot"):
+        query.search(cards, "discipline:Pot")
+    with pytest.raises(query.QueryError, match="unknown clan: brujahh"):
+        query.search(cards, "clan:brujahh")
@@ -0,0 +1,13 @@
+"""Test the sorted-array range index."""
+
+from krcg import utils
+
+
+def test_range_index() -> None:
+    """Bounds are inclusive or not, removed references are gone."""
+    index = utils.RangeIndex[str]()
+    for key, ref in [(2, "b"), (1, "a"), (2, "c"), (3, "d")]:
+        index.add(key, ref)
+    assert index.search(2, 3, high_inclusive=False) == {"b", "c"}
+    index.remove("b")
+    assert index.search(low=2) == {"c", "d"} and len(index) == 3
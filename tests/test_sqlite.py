@@ -0,0 +1,53 @@
+"""Test the SQLite export of the cards library."""
+
+import pathlib
+import sqlite3
+
+from krcg import collections
+from krcg import sqlite
+
+
+def test_export(cards: collections.CardDict, tmp_path: pathlib.Path) -> None:
+    """The exported file answers searches as the in-memory index does."""
+    path = tmp_path / "cards.db"
+    sqlite.export(cards, path)
+    with sqlite.Database(path) as db:
+        assert len(db) == len(cards)
+        alastor = db[100038]
+        assert alastor.printed_name == "Alastor" and alastor.rulings
+        for criteria in [
+            {"type": ["Political Action"], "sect": ["Anarch"]},
+            {"clan": ["Banu Haqim"], "title": ["Justicar"]},
+            {"discipline": ["ani", "pro"], "n": None},
+            {"capacity": ">=8", "clan": ["Brujah"]},
+            {"pool_cost": "<=1", "type": ["Master"], "n": None},
+            {"card_text": "burn", "n": None},
+            {"card_text": '"does not unlock"', "n": None},
+            {"name": "corneilles", "lang": "fr"},
+            {"precon": [None], "n": 5},
+            # punctuation is matched as the Trie splits it, not parsed by FTS5
+            {"card_text": "()", "n": None},
+            {"card_text": "-blood", "n": None},
+            {"card_text": "+1 bleed", "n": None},
+            {"card_text": '"+1 bleed"', "n": None},
+            {"card_text": 'bleed "+1 stealth"', "n": None},
+            {"card_text": '"leed"', "n": None},
+            {"flavor_text": "blood", "n": None},
+            {"name": "l'ange", "n": None},
+        ]:
+            assert [c.id for c in db.search(**criteria)] == [
+                c.id for c in cards.search(**criteria)
+            ], criteria
+        # no criteria: all the cards, as the library gives them
+        assert [c.id for c in db.search()] == [c.id for c in cards.search()]
+        assert len(db.search(n=None)) == len(cards.search(n=None)) == len(cards)
+        assert {c.id for c in db.complete("carr")} == {
+            c.id for c in cards.complete("carr")
+        }
+        assert db.complete("corn", "fr")
+    with sqlite3.connect(path) as connection:
+        (count,) = connection.execute(
+            "SELECT COUNT(*) FROM translations WHERE lang = 'fr'"
+        ).fetchone()
+        assert count == sum(1 for c in cards.cards() if "fr" in c.i18n)
+    connection.close()
@@ -1,5 +1,6 @@
 """Test ruling parsing and the full serialized form of ruling-bearing cards."""
 
+import copy
 import io
 import json
 import pathlib
@@ -7,7 +8,7 @@ import pathlib
 import msgspec.json
 import pytest
 
-from krcg import collections, rulings, vekn_csv
+from krcg import collections, models, rulings, vekn_csv
 
 SNAPSHOTS = pathlib.Path(__file__).parent / "snapshots"
 
@@ -37,11 +38,13 @@ def test_new_format_parsing() -> None:
     cards = collections.CardDict(raw)
     cards.sets = sets
     cards.index()
+    search_index = cards.search_index
     rulings.load_from_files(
         cards,
         io.StringIO(
             "100038|Alastor:\n"
             "  - Plain ruling. [LSJ 20040518]\n"
+            "  - Not with {419 Operation}. [LSJ 20040518]\n"
             "  - Confirms the obvious. [REMINDER]\n"
             "G00008|Grp:\n"
             "  - text: Group text. [LSJ 20040518] [REMINDER]\n"
@@ -68,6 +71,101 @@ def test_new_format_parsing() -> None:
     assert inherited.text == "Group text. [LSJ 20040518]"
     assert inherited.reminder is True
     assert [ref.label for ref in inherited.references] == ["LSJ 20040518"]
+    # the index keeps each wording of the group ruling once, with its cards
+    group = cards.rulings.search(group="Grp")
+    assert [(e.ruling.text, e.cards) for e in group] == [
+        ("Group text. [LSJ 20040518]", [100002]),
+        ("Special wording for this card.", [100015]),
+    ]
+    assert len(cards.rulings) == 5
+    # an indexed library only gets its rulings indexed again
+    assert cards.search_index is search_index
+    assert [c.id for c, _ in cards.referenced_by(cards[100002]).rulings] == [100038]
+
+
+def test_rulings_index(cards: collections.CardDict) -> None:
+    """The rulings index finds what a walk over every card's rulings would."""
+    entries = cards.rulings.entries
+    assert len(entries) < len({id(r) for c in cards.cards() for r in c.rulings})
+    # words match the start of words, phrases anywhere, references are not words
+    lock = cards.rulings.search("lock")
+    assert lock and all("lock" in e.ruling.text.lower() for e in lock)
+    assert not cards.rulings.search("lsj")
+    phrase = cards.rulings.search('"does not unlock"')
+    assert phrase and all("does not unlock" in e.ruling.text for e in phrase)
+    # by reference label or author, by mentioned card, by group, combined
+    assert [e.ruling for e in cards.rulings.search(reference="LSJ 20080125")] == [
+        r
+        for c in cards.cards()
+        for r in c.rulings
+        if any(ref.label == "LSJ 20080125" for ref in r.references)
+    ]
+    lsj = cards.rulings.search(reference="[LSJ]")
+    assert all(
+        any(ref.label.startswith("LSJ ") for ref in e.ruling.references) for e in lsj
+    )
+    revolt = cards["Anarch Revolt"]
+    mentions = cards.rulings.search(card=revolt)
+    assert mentions and all(
+        revolt.id in {c.id for c in e.ruling.cards} for e in mentions
+    )
+    assert cards.rulings.search("lock", reference="LSJ") == [
+        e for e in lock if e in lsj
+    ]
+    # each wording of a group ruling once, with all the cards sharing it
+    assert len(entries) == len(
+        {
+            (r.group, r.text) if r.group else id(r)
+            for c in cards.cards()
+            for r in c.rulings
+        }
+    )
+    (circle,) = cards.rulings.search(group="Circle")
+    assert len(circle.cards) > 10
+    assert all(circle.ruling in cards[i].rulings for i in circle.cards)
+    # cards loaded with their rulings: group rulings are merged back
+    copy = collections.CardDict({c.id: c for c in cards.cards()})
+    copy.index()
+    assert len(copy.rulings.search(group="Circle")) == 1
+    assert len(copy.rulings) == len(cards.rulings)
+
+
+def test_rulings_index_sync(cards: collections.CardDict) -> None:
+    """Adding, updating and removing cards keeps the rulings index in sync."""
+    library = collections.CardDict({c.id: c for c in cards.cards()})
+    library.index()
+    size = len(library.rulings)
+    circle = library.rulings.search(group="Circle")[0]
+    member = library[circle.cards[0]]
+    library.remove(member)
+    assert member.id not in library.rulings.search(group="Circle")[0].cards
+    assert all(member.id not in e.cards for e in library.rulings.search())
+    # a new card with its rulings, a plain one and a copy of a group ruling
+    playtest = copy.deepcopy(member)
+    playtest.id, playtest.printed_name, playtest.name_variants = 290004, "Zap", []
+    playtest.rulings = [
+        models.Ruling(text="Zorglub does not unlock. [LSJ 20080125]"),
+        *(r for r in member.rulings if r.group == "Circle"),
+    ]
+    playtest.rulings[0].references = [
+        models.Ruling.Reference(text="[LSJ 20080125]", label="LSJ 20080125", url="")
+    ]
+    library.add(playtest)
+    (zorglub,) = library.rulings.search("zorglub")
+    assert zorglub.cards == [290004]
+    assert zorglub in library.rulings.search(reference="LSJ")
+    assert 290004 in library.rulings.search(group="Circle")[0].cards
+    assert len(library.rulings.search(group="Circle")) == 1
+    # updated in place: the former rulings go
+    playtest.rulings = playtest.rulings[1:]
+    library.update(playtest)
+    assert not library.rulings.search("zorglub")
+    library.remove(playtest)
+    assert not any(290004 in e.cards for e in library.rulings.search())
+    # a new index starts over from the cards
+    library.add(member)
+    library.index()
+    assert len(library.rulings) == size
 
 
 @pytest.mark.baseline
@@ -0,0 +1,18 @@
+"""Test the TF-IDF text similarity matrix."""
+
+from krcg import utils
+
+
+def test_tfidf() -> None:
+    """Texts sharing rarer words are more similar, empty texts are left out."""
+    tfidf = utils.TfIdf(
+        [
+            (1, "burn a vampire"),
+            (2, "burn the vampire ally"),
+            (3, "gain a blood"),
+            (4, ""),
+        ]
+    )
+    assert len(tfidf) == 3 and 4 not in tfidf
+    assert [ref for ref, _ in tfidf.similar(1)] == [2, 3]
+    assert tfidf.similar(1, 1)[0][1] > tfidf.similar(1)[1][1] > 0
@@ -1,13 +1,23 @@
 """Test the VTES cards database: fuzzy lookup, translations, and search."""
 
+from concurrent import futures
+import copy
+import datetime
+import difflib
+import gc
 import json
 import pathlib
+import pickle
+import sys
 
 import msgspec.json
+import numpy
 import pytest
+import unidecode
 
 from krcg import collections
 from krcg import models
+from krcg import utils
 
 SNAPSHOTS = pathlib.Path(__file__).parent / "snapshots"
 
@@ -18,6 +28,137 @@ def test_fuzzy_match(cards: collections.CardDict) -> None:
     assert cards["enchant kidnred"].printed_name == "Enchant Kindred"
 
 
+def test_close_matches(cards: collections.CardDict) -> None:
+    """The bigram index finds the same close match as a full difflib scan."""
+    keys = [k for k in cards if isinstance(k, str)]
+    for word in [
+        "enchant kidnred",
+        "govern the unalinged",
+        "sascha vykos the angel of cain",
+        "carrion crowz",
+        "the the the the",
+        "zzzzzzzzzzzz",
+    ]:
+        for cutoff in [0.6, 0.85, 0.95]:
+            assert cards._close_matches.match(word, cutoff) == next(
+                iter(difflib.get_close_matches(word, keys, n=1, cutoff=cutoff)), None
+            )
+
+
+def test_normalize(cards: collections.CardDict) -> None:
+    """The ASCII fast path and the memo normalize as unidecode does."""
+    assert utils.normalize("  Carrion Crows ") == "carrion crows"
+    assert utils.normalize("Ghoul Retainer\t") == "ghoul retainer"
+    assert utils.normalize("Corneilles noires") == "corneilles noires"
+    assert (
+        utils.normalize("Étrange Ça") == utils.normalize("Étrange Ça") == "etrange ca"
+    )
+    assert utils.normalize(42) == 42
+    for card in cards.values():
+        for name in [card.full_name, *(t.name for t in card.i18n.values())]:
+            assert utils.normalize(name) == unidecode.unidecode(name).lower().strip()
+
+
+def test_alias_store(cards: collections.CardDict, tmp_path: pathlib.Path) -> None:
+    """Card names resolve through a store of learned aliases."""
+    cards_store = utils.AliasStore(tmp_path / "cards.json", "1.0")
+    library = pickle.loads(pickle.dumps(cards))
+    library._learned.clear()
+    library.attach(cards_store)
+    assert library["Govern the Unalinged"].id == cards["Govern the Unaligned"].id
+    library.flush()
+    assert "govern the unalinged" in cards_store.load()
+
+
+def test_concurrent_reads(cards: collections.CardDict) -> None:
+    """Lookups, completions and searches from many threads match serial ones."""
+    # tiny caches: concurrent lookups keep evicting each other's entries
+    names = utils.FuzzyDict[str, int](learned_size=4, misses_size=4)
+    for card in cards.cards():
+        names[card.printed_name] = card.id
+    trie = cards.search_index.name[models.Lang.EN]
+    size = len(trie)
+    calls = [
+        lambda: cards["Alastr"],
+        lambda: "Carrion Crowz" in cards,
+        lambda: "zzzzzzzzzzzz" in cards,
+        lambda: names.get_many(["Alastr", "Carrion Crowz", "Govern the Unalinged"]),
+        lambda: [names.get(f"Zzzzzzzzz {i}") for i in range(8)],
+        lambda: cards.complete("ala"),
+        lambda: cards.complete("zzzz", lang=models.Lang.FR),
+        lambda: cards.search(clan=["Nosferatu"], capacity=["8..11"]),
+        lambda: cards.search(card_text=['"does not unlock"'], n=None),
+        lambda: trie.search("zzzz qqqq"),
+        lambda: cards.similar(cards["Carrion Crows"], 5),
+    ]
+    expected = [call() for call in calls]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with futures.ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda i: calls[i % len(calls)](), range(800)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert results == [expected[i % len(calls)] for i in range(800)]
+    # reads insert nothing
+    assert len(trie) == size
+    assert "zzzz" not in cards.search_index.name.completions[models.Lang.FR]
+    # every learned lookup counted: 3 per bulk lookup, 8 misses per get
+    assert sum(names.cache_info()["learned"][:2]) == 3 * len(range(3, 800, 11)) + 3
+    assert sum(names.cache_info()["negative"][:2]) == 8 * len(range(4, 800, 11)) + 8
+
+
+def test_get_many(cards: collections.CardDict) -> None:
+    """Bulk lookups tell how each name matched, like single lookups would."""
+    alias = next(k for k, v in cards._aliases.items() if isinstance(k, str))
+    names = ["Alastor", "alastor", "Alastr", alias, "zzzzzzzzzz", "Alastr", 100038]
+    result = cards.get_many(names)
+    assert list(result) == list(dict.fromkeys(names))
+    assert [r.match for r in result.values()] == [
+        utils.Match.EXACT,
+        utils.Match.EXACT,
+        utils.Match.FUZZY,
+        utils.Match.ALIAS,
+        utils.Match.MISSING,
+        utils.Match.EXACT,
+    ]
+    for name, lookup in result.items():
+        assert lookup.value is cards.get(name)
+
+
+def test_find_mentions(
+    cards: collections.CardDict,
+    library: collections.CardDict,
+    playtest: models.CryptCard,
+) -> None:
+    """Card names are found in a text as lookups would resolve them."""
+    text = (
+        "Played Carrion Crows, then Govern the Unaligned on Anson (G1) "
+        "and Théo Bell: Corneilles noires! Nothing for Carrion Crowz, or crowsfeet."
+    )
+    mentions = cards.find_mentions(text)
+    names = [text[m.start : m.end] for m in mentions]
+    assert names == [
+        "Carrion Crows",
+        "Govern the Unaligned",
+        "Anson (G1)",
+        "Théo Bell",
+        "Corneilles noires",
+    ]
+    for name, mention in zip(names, mentions):
+        assert mention.reference is cards[name]
+    # added cards are found, removed ones are not
+    assert [m.reference for m in library.find_mentions("a zap")] == [playtest]
+    library.remove(playtest)
+    assert library.find_mentions("a zap") == []
+    # built on first use, rebuilt after unpickling
+    crows = collections.CardDict({100301: cards["Carrion Crows"]})
+    assert crows.names is None and crows.find_mentions("carrion crows")
+    assert crows.names is not None
+    copied = pickle.loads(pickle.dumps(crows))
+    assert copied.names is None and copied.find_mentions("carrion crows")
+
+
 def test_i18n(cards: collections.CardDict) -> None:
     """A card resolves by its translated name."""
     assert "Corneilles noires" in cards
@@ -26,8 +167,8 @@ def test_i18n(cards: collections.CardDict) -> None:
 
 def test_search_mechanics(cards: collections.CardDict) -> None:
     """Search input handling and the classification rules behind the dimensions."""
-    # no parameter returns nothing; unknown dimension raises; unknown value is empty
-    assert len(cards.search()) == 0
+    # no parameter returns all cards; unknown dimension raises; unknown value is empty
+    assert len(cards.search(n=None)) == len(cards)
     with pytest.raises(ValueError):
         cards.search(foo="bar")
     assert len(cards.search(bonus="foo")) == 0
@@ -66,6 +207,315 @@ def test_search_i18n(cards: collections.CardDict) -> None:
     assert es == [cards["Living Manse"], cards["The Ankara Citadel, Turkey"]]
 
 
+def test_search_phrase(cards: collections.CardDict) -> None:
+    """A quoted value matches as an exact phrase or infix, through the markup."""
+    unlock = cards.search(card_text='"does not unlock"', n=None)
+    assert unlock and all("does not unlock" in c.text for c in unlock)
+    # an infix matches inside words, where a word prefix would not
+    assert not cards.search(card_text="ood dol")
+    assert cards["Vessel"] in cards.search(card_text='"ood dol"')
+    # phrases and words combine, all must match
+    assert cards.search(card_text='"ood dol" blood') == cards.search(
+        card_text='"ood dol"'
+    )
+    assert not cards.search(card_text='"ood dol" "does not unlock"')
+    # case, accents and the <Card Name> markup do not matter
+    assert cards.search(card_text='"Cards named INTO THIN AIR"') == [
+        cards["Lost in Crowds"]
+    ]
+    assert cards["Lost in Crowds"] in cards.search(
+        card_text='"nommees volatilisé"', lang=models.Lang.FR
+    )
+
+
+def test_incremental_index(cards: collections.CardDict) -> None:
+    """Adding, updating and removing a card keeps the search index in sync."""
+    subset = collections.CardDict(
+        {c.id: c for c in cards.search(clan=["Nosferatu"], n=None)}
+    )
+    subset.index()
+
+    def indexes() -> dict:
+        ret = dict(subset.search_index.__dict__)
+        # the card table is shared, similarity matrices and catalogue are rebuilt
+        # on demand
+        del ret["table"], ret["similarity"], ret["catalogue"], ret["_lock"]
+        ret["ranges"] = {
+            dim: sorted(zip(index.keys, index.references))
+            for dim, index in ret["ranges"].items()
+        }
+        return ret
+
+    reference = copy.deepcopy(indexes())
+    # a playtest card, injected after indexing
+    playtest = copy.deepcopy(cards["Aid from Bats"])
+    playtest.id, playtest.printed_name, playtest.name_variants = 900001, "Zap", []
+    playtest.text = "Playtest: does not unlock."
+    subset.add(playtest)
+    assert subset["Zap"] is playtest
+    assert subset.search(card_text='"playtest"') == [playtest]
+    assert playtest in subset.complete("zap")
+    assert playtest in subset.complete("z")
+    assert playtest in subset.search(discipline=["ani"])
+    # corrected in place, then updated: the old text no longer matches
+    playtest.text = "Corrected: unlocks."
+    subset.update(playtest)
+    assert not subset.search(card_text="playtest")
+    assert subset.search(card_text="corrected") == [playtest]
+    # removed: gone from names and indexes, which match a full reindex again
+    assert subset.remove(playtest) is playtest
+    assert 900001 not in subset and "Zap" not in subset
+    assert not subset.complete("zap")
+    assert len(subset) == len(list(subset.cards())) == len(subset.table.slots) - 1
+    assert indexes() == reference
+    # an existing card is replaced whole
+    petra = subset.remove(cards["Petra"].id)
+    assert not subset.search(name="petra")
+    subset.add(petra)
+    subset.add(petra)
+    assert indexes() == reference
+
+
+def test_search_ranges(cards: collections.CardDict) -> None:
+    """Range criteria match numbers and dates, and combine with other filters."""
+    crypt = [c for c in cards.cards() if isinstance(c, models.CryptCard)]
+    big = cards.search(capacity=">=8", clan=["Brujah"], n=None)
+    assert big == cards.search(
+        clan=["Brujah"], capacity=[str(i) for i in range(8, 12)], n=None
+    )
+    assert len(cards.search(capacity="8..11", n=None)) == sum(
+        1 for c in crypt if c.capacity and 8 <= c.capacity <= 11
+    )
+    assert cards["Alamut"] in cards.search(pool_cost="<2", n=None)
+    assert cards["Alastor"] not in cards.search(pool_cost="..", n=None)
+    assert all(
+        c.cost and c.cost.value == 1 for c in cards.search(pool_cost="1", n=None)
+    )
+    old = cards.search(legal="<1995", n=None)
+    assert old and all(c.legal and c.legal.year < 1995 for c in old)
+    assert len(cards.search(banned="..", n=None)) == sum(
+        1 for c in cards.cards() if c.banned
+    )
+    with pytest.raises(ValueError, match="legal value '<yesterday'"):
+        cards.search(legal="<yesterday")
+    with pytest.raises(ValueError, match="invalid pool_cost value None"):
+        cards.search(pool_cost=[None])
+    with pytest.raises(ValueError, match="'a-b' is not a number"):
+        cards.search(pool_cost="a-b")
+
+
+def test_similar(cards: collections.CardDict) -> None:
+    """Cards with similar texts come first, in any language."""
+    deflection = cards["Deflection"]
+    similar = cards.similar(deflection, 5)
+    assert len(similar) == 5 and deflection not in similar
+    assert cards["Redirection"] in similar
+    assert cards["Murder of Crows"] in cards.similar(cards["Carrion Crows"], 5, "fr")
+    # nothing to compare to before indexing, or in an empty library
+    assert not collections.CardDict().similar(deflection)
+    pair = collections.CardDict({c.id: c for c in [deflection, cards["Redirection"]]})
+    assert not pair.similar(deflection)
+    pair.index()
+    assert pair.similar(deflection) == [cards["Redirection"]]
+    # built on first use, rebuilt after unpickling
+    assert pair.search_index.similarity
+    assert not pickle.loads(pickle.dumps(pair)).search_index.similarity
+
+
+def test_search_result(
+    cards: collections.CardDict, library: collections.CardDict
+) -> None:
+    """Lazy results count, page and iterate the cards search would return."""
+    result = cards.search_result(clan=["Nosferatu"])
+    expected = cards.search(clan=["Nosferatu"], n=None)
+    assert result.count() == len(expected) > 100
+    assert [c.printed_name for c in result] == [c.printed_name for c in expected]
+    assert result.ids() == [c.id for c in result]
+    assert cards["Petra"] in result and cards["Alastor"] not in result
+    pages, cursor = [], None
+    while True:
+        page = result.page(40, cursor)
+        pages.extend(page.cards)
+        if page.cursor is None:
+            break
+        cursor = page.cursor
+    assert pages == list(result)
+    # a cursor resumes after its card in a later search, even if cards changed
+    first, second = result.page(10), [c.id for c in list(result)[10:20]]
+    library.remove(first.cards[3].id)
+    later = library.search_result(clan=["Nosferatu"]).page(10, first.cursor)
+    assert [c.id for c in later.cards] == second
+    for invalid in ["garbage", "x:Petra"]:
+        with pytest.raises(ValueError, match="invalid cursor"):
+            result.page(10, invalid)
+    assert not cards.search_result(name=["zzzzz"])
+
+
+def test_facets(cards: collections.CardDict) -> None:
+    """Facet counts match the searches they stand for."""
+    facets = cards.facets(["clan", "discipline"], sect=["Camarilla"])
+    for dimension, counts in facets.items():
+        assert list(counts.values()) == sorted(counts.values(), reverse=True)
+        for value, count in counts.items():
+            found = cards.search(sect=["Camarilla"], **{dimension: [value]}, n=None)
+            assert len(found) == count > 0
+    assert "Baali" not in facets["clan"]
+    assert None in cards.facets(["clan"])["clan"]
+    result = cards.search_result(clan=["Nosferatu"])
+    counts = cards.search_index.facets([models.SearchDimension.CLAN], result.ordinals)
+    assert counts == {models.SearchDimension.CLAN: {"Nosferatu": result.count()}}
+    with pytest.raises(ValueError):
+        cards.facets(["card_text"])
+
+
+def test_playability(
+    cards: collections.CardDict,
+    library: collections.CardDict,
+    playtest: models.CryptCard,
+) -> None:
+    """The playability index matches the requirements, both ways, as cards change."""
+    anson, kiss = cards["Anson"], cards["Kiss of Ra"]
+    playable = cards.playable(anson)
+    assert kiss not in playable and cards["Govern the Unaligned"] in playable
+    # combos need every discipline, at any level, clan cards the clan
+    assert cards["Bliss"] in playable and cards["Draught of the Soul"] not in playable
+    assert cards["Art Museum"] in playable and cards["Temptation"] not in playable
+    assert cards["Karsh"] in cards.players(kiss)
+    assert anson not in cards.players(kiss)
+    # whole crypt: cards playable by any of its vampires
+    crypt = [anson, cards["Karsh"]]
+    assert set(cards.playable(crypt)) == set(playable) | set(cards.playable(crypt[1]))
+    for card in cards.playable(crypt[1]):
+        assert crypt[1] in cards.players(card)
+    # a playtest vampire gets its library cards, and loses them once removed
+    playtest.clan, playtest.disciplines = "Ministry", ["ser", "qui"]
+    library.update(playtest)
+    temptation = library["Temptation"]
+    assert library["Art Museum"] not in library.playable(playtest)
+    assert temptation in library.playable(playtest)
+    assert playtest in library.players(temptation)
+    # updated incrementally, as a full rebuild would
+    players = library.search_index.players
+    library.search_index.index_playability()
+    assert library.search_index.players == players
+    library.remove(playtest)
+    assert playtest.id not in library.players(temptation).ids()
+
+
+def test_feature_matrix(
+    cards: collections.CardDict,
+    library: collections.CardDict,
+    playtest: models.CryptCard,
+) -> None:
+    """The feature matrix matches the cards, and follows their changes."""
+    matrix = cards.feature_matrix()
+    assert cards.feature_matrix() is matrix
+    assert len(matrix) == len(cards.search_index.values)
+    anson = matrix.row(cards["Anson"].id)
+    assert anson[matrix.positions["discipline:pre"]] == 2
+    assert anson[matrix.positions["discipline:aus"]] == 1
+    assert anson[matrix.positions["discipline:pot"]] == 0
+    assert anson[matrix.positions["clan:Toreador"]] == 1
+    assert anson[matrix.positions["capacity"]] == 8
+    assert numpy.isnan(anson[matrix.positions["pool_cost"]])
+    bliss = matrix.row(cards["Bliss"].id)
+    assert bliss[matrix.positions["trait:Combo"]] == 1
+    assert bliss[matrix.positions["discipline:dom"]] == 1
+    superior = matrix.ids[matrix.column("discipline:pot") == 2]
+    found = cards.search(discipline=["POT"], n=None)
+    assert set(superior.tolist()) == {card.id for card in found}
+    for card in cards.search(pool_cost="3..", n=None):
+        assert matrix.row(card.id)[matrix.positions["pool_cost"]] >= 3
+    # built again once the cards change
+    added = library.feature_matrix()
+    assert added.row(playtest.id)[added.positions["capacity"]] == 8
+    library.remove(playtest)
+    assert len(library.feature_matrix()) == len(added) - 1 == len(matrix)
+    with pytest.raises(KeyError):
+        library.feature_matrix().row(playtest.id)
+
+
+def test_as_of(cards: collections.CardDict) -> None:
+    """A point-in-time view keeps the cards printed by then and not banned yet."""
+    date = datetime.date(2010, 1, 1)
+    view = cards.as_of("2010-01-01")
+    assert {c.id for c in view} == {
+        c.id
+        for c in cards.cards()
+        if c.legal <= date and not (c.banned and c.banned <= date)
+    }
+    anthelios = cards["Anthelios, The Red Star"]
+    assert anthelios in view and anthelios not in cards.as_of("2016-02-16")
+    assert view["Anthelios, The Red Star"] is anthelios
+    with pytest.raises(KeyError):
+        view["Bait and Switch"]
+    assert cards["Bait and Switch"] in cards.as_of(datetime.date.today())
+    # searches and completions among the view cards
+    ministry = cards.as_of("2020-01-01").search(clan=["Ministry"], n=None)
+    assert ministry and all(c.legal <= datetime.date(2020, 1, 1) for c in ministry)
+    assert len(ministry) < len(cards.search(clan=["Ministry"], n=None))
+    assert all(c in view for c in view.complete("ala"))
+    # formats: every card is in Standard, the V5 ones in V5 too
+    v5 = cards.as_of(datetime.date.today(), models.Format.V5)
+    assert 0 < len(v5) < 50 and all(models.Format.V5 in c.formats for c in v5)
+    assert len(cards.as_of(datetime.date.today(), "V5")) == len(v5)
+    for invalid in ["v5", "Modern"]:
+        with pytest.raises(ValueError):
+            cards.as_of(datetime.date.today(), invalid)
+    # the first cards by name, as the library search sorts them
+    assert (
+        view.search(clan=["Ministry"], n=3)
+        == view.search(clan=["Ministry"], n=None)[:3]
+    )
+
+
+def test_complete(cards: collections.CardDict) -> None:
+    """Precomputed completions rank as the name search does, in every language."""
+    names = cards.search_index.name
+    for text in ["a", "th", "pentex", "enzo g", "Corn", "é", '"crows"', "zzz"]:
+        for lang in models.Lang:
+            assert names.complete(text, 10, lang) == names.search_flat(text, 10, lang)
+    assert names.completions[models.Lang.FR]["corn"]
+    # built on first use, rebuilt after unpickling
+    assert not pickle.loads(pickle.dumps(names)).completions
+    assert cards.complete("corneilles", models.Lang.FR)[0] == cards["Carrion Crows"]
+
+
+def test_card_table(cards: collections.CardDict) -> None:
+    """The card table iterates in id order and keeps ordinals stable."""
+    assert [c.id for c in cards.cards()] == sorted(c.id for c in cards.cards())
+    # load_local adds the crypt before the library: index() sorts the slots once
+    assert cards.table._ordered
+    assert [c.id for c in cards.table.slots if c] == [c.id for c in cards.cards()]
+    table = collections.CardTable()
+    crows, bats = cards["Carrion Crows"], cards["Aid from Bats"]
+    assert table.add(crows) == 0 and table.add(bats) == 1
+    assert list(table) == sorted([crows, bats], key=lambda c: c.id)
+    assert table.remove(crows.id) is crows
+    assert len(table) == 1 and list(table) == [bats]
+    with pytest.raises(KeyError):
+        table.remove(crows.id)
+    assert table.add(crows) == 0 and table[0] is crows
+    assert not table._ordered
+    table.remove(bats.id)
+    table.sort()
+    assert table._ordered and table.slots == [crows] and table.ordinals == {crows.id: 0}
+
+
+def test_card_features(cards: collections.CardDict) -> None:
+    """Features derived from the text are computed once and match the index."""
+    kasim = cards.features(cards["Kasim Bayar"])
+    assert kasim.titles == [models.Title.JUSTICAR]
+    assert kasim.sects == [models.Sect.CAMARILLA]
+    assert cards.features(cards["Crusade: Chicago"]).city == "Chicago"
+    assert cards.features(cards["Tracker's Mark"]).bonuses == [models.Bonus.INTERCEPT]
+    # cached by the index, and the same as derived on the fly
+    card = cards["Sennadurek"]
+    assert cards.features(card) is cards.features(card)
+    assert cards.features(card) == collections.card_features(card)
+    assert models.Trait.BLACK_HAND in cards.features(card).traits
+
+
 def test_search_dimensions(cards: collections.CardDict) -> None:
     """The search dimensions expose the expected facets and sample choices."""
     dims = cards.search_dimensions
@@ -76,6 +526,7 @@ def test_search_dimensions(cards: collections.CardDict) -> None:
         "city",
         "clan",
         "discipline",
+        "format",
         "group",
         "kind",
         "path",
@@ -90,6 +541,29 @@ def test_search_dimensions(cards: collections.CardDict) -> None:
     assert "Brujah" in dims["clan"]
     assert "AUS" in dims["discipline"]
     assert "Imperator" in dims["title"]
+    assert dims["format"] == ["Standard", "V5"]
+
+
+def test_search_catalogue(
+    library: collections.CardDict, playtest: models.CryptCard
+) -> None:
+    """The catalogue is computed once, counts the cards, and follows their changes."""
+    catalogue = library.search_catalogue
+    assert library.search_index.dimension_catalogue() is library.search_index.catalogue
+    assert list(catalogue) == list(library.search_dimensions)
+    for dimension, counts in catalogue.items():
+        assert list(counts) == library.search_dimensions[dimension]
+    assert catalogue["clan"]["Nosferatu"] == len(
+        library.search(clan=["Nosferatu"], n=None)
+    )
+    assert catalogue["format"]["Standard"] == len(library)
+    playtest.clan = "Zzz"
+    library.update(playtest)
+    assert not library.search_index.catalogue
+    assert library.search_catalogue["clan"]["Zzz"] == 1
+    assert library.search_dimensions["clan"][-1] == "Zzz"
+    library.remove(playtest)
+    assert "Zzz" not in library.search_catalogue["clan"]
 
 
 @pytest.mark.baseline
@@ -125,3 +599,17 @@ def test_serialization_smoke(cards: collections.CardDict) -> None:
     """The whole card database serializes through msgspec without error."""
     assert len(cards) > 4000
     assert len(msgspec.json.encode(list(cards.cards()))) > 0
+
+
+def test_card_union(cards: collections.CardDict) -> None:
+    """Cards decode back to their kind, through the union tagged by ``kind``."""
+    data = msgspec.json.encode(list(cards.cards()))
+    decoded = msgspec.json.decode(data, type=list[models.AnyCard])
+    assert [type(card) for card in decoded] == [type(card) for card in cards.cards()]
+    anson = next(card for card in decoded if card.id == cards["Anson"].id)
+    assert anson == cards["Anson"] and anson.kind == models.Card.Kind.CRYPT
+    assert anson.disciplines == cards["Anson"].disciplines
+    assert msgspec.to_builtins(anson) == msgspec.to_builtins(cards["Anson"])
+    # no per-instance dict, not tracked by the garbage collector
+    assert not hasattr(anson, "__dict__")
+    assert not gc.is_tracked(anson)